@@ -1,10 +1,67 @@
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-import json
-
-def fetch_solidcore_schedule(slug="chelsea", date="2025-05-25"):
-    url = "https://solidcore.co/assets/ajax/addMoreClassesStaticGrid.php"
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import date, datetime, timedelta
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import argparse
+import threading
+import os
+import sys
+
+import metrics
+from metrics import timer
+from schedule_output import ScheduleStreamWriter
+from schedule_cache import ScheduleCache, content_hash
+from schedule_parser import parse_classes
+from schedule_records import records_from_dicts
+from schedule_store import ScheduleStore
+
+SCHEDULE_URL = "https://solidcore.co/assets/ajax/addMoreClassesStaticGrid.php"
+DEFAULT_SLUG = "chelsea"
+WEEKS_AHEAD = 5
+MAX_CONNECTIONS_PER_HOST = 8
+REQUEST_TIMEOUT = 15
+OUTPUT_PATHS = ["solidcore_schedule.json", "public/solidcore_schedule.json"]
+
+FetchResult = namedtuple("FetchResult", ["slug", "date", "html", "error"])
+
+_session = None
+_session_lock = threading.Lock()
+_host_semaphores = {}
+
+def get_session():
+    """Return the shared keep-alive session used for all schedule requests"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=None,  # the schedule POST is a read, safe to retry
+            )
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+def _host_semaphore(url):
+    host = urlparse(url).netloc
+    with _session_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+        return _host_semaphores[host]
+
+def schedule_request(slug, date):
+    """Headers and form payload for one addMoreClassesStaticGrid.php request"""
     headers = {
         "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
         "User-Agent": "Mozilla/5.0",
@@ -16,40 +73,55 @@ def fetch_solidcore_schedule(slug="chelsea", date="2025-05-25"):
         "slug": slug,
         "dateChange": date
     }
+    return headers, payload
+
+def fetch_solidcore_schedule(slug=DEFAULT_SLUG, date="2025-05-25", session=None, url=SCHEDULE_URL):
+    headers, payload = schedule_request(slug, date)
 
-    response = requests.post(url, headers=headers, data=payload)
+    session = session or get_session()
+    with _host_semaphore(url), timer("schedule_fetch"):
+        response = session.post(url, headers=headers, data=payload, timeout=REQUEST_TIMEOUT)
+    metrics.count("schedule_fetch_bytes", len(response.content))
     response.raise_for_status()
     data = response.json()
     return data.get("finalData", "")  # Extract HTML from the JSON response
 
-def get_next_sunday_or_today():
-    today = datetime.today()
-    # If today is Sunday, use today; otherwise, go to next Sunday
-    return today if today.weekday() == 6 else today + timedelta(days=(6 - today.weekday()))
+def fetch_all_schedules(slugs, dates, max_workers=32, session=None, url=SCHEDULE_URL):
+    """Fetch every (slug, week) pair concurrently.
 
-def parse_classes(html):
-    soup = BeautifulSoup(html, "html.parser")
-    results = []
+    Results come back in slug-major, date-minor order regardless of which
+    request finished first. Failures are captured per pair in `error`.
+    """
+    session = session or get_session()
+    pairs = [(slug, date) for slug in slugs for date in dates]
 
-    for day in soup.select(".schedule-day"):
-        date_tag = day.select_one(".schedule-day-header-date")
-        date_str = date_tag.text.strip() if date_tag else "Unknown"
+    def fetch(pair):
+        slug, date = pair
+        try:
+            return FetchResult(slug, date, fetch_solidcore_schedule(slug, date, session=session, url=url), None)
+        except Exception as e:
+            return FetchResult(slug, date, "", e)
 
-        for li in day.select("ul.classes > li"):
-            name_tag = li.select_one("h4.class-name")
-            time_tag = li.select_one("div.class-time")
-            teacher_tag = li.select_one("div.class-teacher")
-            status_tag = li.select_one("div.class-status")
+    if not pairs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs))) as pool:
+        return list(pool.map(fetch, pairs))
 
-            results.append({
-                "date": date_str,
-                "name": name_tag.text.strip() if name_tag else "",
-                "time": time_tag.text.strip() if time_tag else "",
-                "teacher": teacher_tag.text.strip() if teacher_tag else "",
-                "status": status_tag.text.strip() if status_tag else ""
-            })
+def raw_html_path(slug, date_str):
+    # Keep the original file names for the default studio
+    if slug == DEFAULT_SLUG:
+        return f"raw_{date_str}.html"
+    return f"raw_{slug}_{date_str}.html"
 
-    return results
+def get_next_sunday_or_today():
+    today = datetime.today()
+    # If today is Sunday, use today; otherwise, go to next Sunday
+    return today if today.weekday() == 6 else today + timedelta(days=(6 - today.weekday()))
+
+def get_this_sunday():
+    """The Sunday that starts the current week (today, if it's Sunday)"""
+    today = datetime.today()
+    return today - timedelta(days=(today.weekday() + 1) % 7)
 
 def get_next_sundays(start_date, weeks=5):
     # Only get dates within the current month
@@ -63,48 +135,94 @@ def get_next_sundays(start_date, weeks=5):
     
     return dates
 
-if __name__ == "__main__":
-    date = get_next_sunday_or_today()
-    all_data = []
-
-    for _ in range(5):  # Try up to 5 weeks ahead
-        date_str = date.strftime("%Y-%m-%d")
-        print(f"📆 Fetching week: {date_str}")
-        try:
-            html = fetch_solidcore_schedule(date=date_str)
-            if not html:  # If no HTML content returned
-                print("🛑 No data returned — stopping.")
-                break
-                
-            with open(f"raw_{date_str}.html", "w", encoding="utf-8") as f:
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape Solidcore class schedules")
+    parser.add_argument("slugs", nargs="*", default=[DEFAULT_SLUG], help="studio slugs to scrape")
+    parser.add_argument("--ndjson", metavar="PATH", help="also stream records to PATH as NDJSON, week by week")
+    parser.add_argument("--db", default="schedule.db", help="SQLite schedule history to ingest into")
+    args = parser.parse_args(argv)
+    metrics.configure()
+    slugs = args.slugs
+    start = get_next_sunday_or_today()
+    # Try up to 5 weeks ahead for every studio, all at once
+    dates = [(start + timedelta(weeks=i)).strftime("%Y-%m-%d") for i in range(WEEKS_AHEAD)]
+    print(f"📆 Fetching {len(dates)} weeks for {', '.join(slugs)}")
+    results = fetch_all_schedules(slugs, dates)
+    cache = ScheduleCache()
+    writer = ScheduleStreamWriter(OUTPUT_PATHS, ndjson_path=args.ndjson)
+    changed = []
+    changed_records = []
+    weeks_seen = []
+
+    current_slug, stopped = None, False
+    for result in results:
+        slug, date_str, html = result.slug, result.date, result.html
+        if slug != current_slug:
+            current_slug, stopped = slug, False
+        if stopped:
+            continue
+
+        if isinstance(result.error, requests.HTTPError):
+            print(f"❌ Error for {slug} {date_str}: {result.error}")
+            stopped = True
+            continue
+        if result.error:
+            print(f"❌ Unexpected error for {slug} {date_str}: {result.error}")
+            stopped = True
+            continue
+        if not html:  # If no HTML content returned
+            print(f"🛑 No data returned for {slug} {date_str} — stopping.")
+            stopped = True
+            continue
+
+        digest = content_hash(html)
+        week_data = cache.get(slug, date_str, digest)
+        if week_data is None:
+            with open(raw_html_path(slug, date_str), "w", encoding="utf-8") as f:
                 f.write(html)
             week_data = parse_classes(html)
+            cache.put(slug, date_str, digest, week_data)
+            changed.append((slug, date_str))
+
+        if not week_data:
+            print(f"🛑 No classes found for {slug} {date_str} — stopping.")
+            stopped = True
+            continue
+
+        for item in week_data:
+            item["location"] = slug
+            # MM/DD carries no year; the week it was fetched for pins it down
+            item["week_of"] = date_str
+        writer.write_week(week_data)
+        if changed and changed[-1] == (slug, date_str):
+            changed_records.extend(records_from_dicts(week_data, slug, date.fromisoformat(date_str)))
+        weeks_seen.append((slug, date_str))
+        status = "changed" if changed and changed[-1] == (slug, date_str) else "unchanged"
+        print(f"✅ Found {len(week_data)} classes for {slug} {date_str} ({status})")
+
+    weeks_differ = cache.record_run(weeks_seen)
+    cache.save()
+    if changed_records:
+        with ScheduleStore(args.db) as store:
+            print(f"🗄️  Stored {store.ingest(changed_records)} classes in {args.db}")
+    if changed:
+        print(f"🔄 Changed weeks: {', '.join(f'{s} {d}' for s, d in changed)}")
+    elif weeks_differ:
+        print("🔄 Set of available weeks changed")
+    elif os.path.exists(OUTPUT_PATHS[0]):
+        writer.abort()
+        print("💤 No weeks changed since the last run — outputs left as they are.")
+        return 0
+
+    # public/solidcore_schedule.json is read by the frontend, so it is
+    # only ever replaced whole
+    saved = writer.paths
+    writer.commit()
+    for path in saved:
+        print(f"✅ Saved {path}")
+
+    print(f"✅ Total classes scraped: {writer.count}")
+    return 0
 
-            if not week_data:
-                print("🛑 No classes found — stopping.")
-                break
-
-            all_data.extend(week_data)
-            print(f"✅ Found {len(week_data)} classes for {date_str}")
-        except requests.HTTPError as e:
-            print(f"❌ Error for {date_str}: {e}")
-            break
-        except Exception as e:
-            print(f"❌ Unexpected error for {date_str}: {e}")
-            break
-
-        date += timedelta(weeks=1)
-
-    with open("solidcore_schedule.json", "w") as f:
-        json.dump(all_data, f, indent=2)
-
-    # Also save to public/solidcore_schedule.json for frontend use
-    try:
-        with open("public/solidcore_schedule.json", "w") as f:
-            json.dump(all_data, f, indent=2)
-        print("✅ Also saved to public/solidcore_schedule.json")
-    except Exception as e:
-        print(f"❌ Could not save to public/solidcore_schedule.json: {e}")
-
-    print(f"✅ Total classes scraped: {len(all_data)}")
-
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+import { NextResponse } from "next/server"
+
+// Force dynamic rendering for this route
+export const dynamic = "force-dynamic"
+
+// `python slot_search.py --serve 8765` keeps the slot index in memory
+const SLOT_SEARCH_URL = process.env.SLOT_SEARCH_URL || "http://127.0.0.1:8765"
+
+// GET /api/slots?family=Signature50&teacher=...&days=weekdays&between=6-8pm&area=Manhattan
+export async function GET(req: Request) {
+  const { searchParams } = new URL(req.url)
+  try {
+    const response = await fetch(`${SLOT_SEARCH_URL}/slots?${searchParams.toString()}`, { cache: "no-store" })
+    const body = await response.json()
+    return NextResponse.json(body, { status: response.status })
+  } catch (error) {
+    console.error("Error searching slots:", error)
+    return NextResponse.json({ results: [], total: 0, error: "Slot search is unavailable" }, { status: 503 })
+  }
+}
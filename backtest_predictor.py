@@ -0,0 +1,72 @@
+import sys
+import time
+from datetime import timedelta
+
+from schedule_predictor import RecurringSlotModel, base_name
+from schedule_store import ScheduleStore
+
+
+def class_key(record, day=None):
+    return (record.location, day or record.day, record.start_min, base_name(record.name), record.teacher)
+
+
+def backtest(records, train_weeks=12, horizon_weeks=4, min_confidence=0.5, step_weeks=4):
+    """Train on `train_weeks` before each cutoff, score the next `horizon_weeks`.
+
+    Cutoffs are Mondays stepping through the history. Each prediction is
+    matched to a real class on (location, date, start time, class, teacher).
+    Returns one dict per cutoff with precision, recall and runtime.
+    """
+    records = [r for r in records if r.day is not None]
+    if not records:
+        return []
+    first = min(r.day for r in records)
+    last = max(r.day for r in records)
+    cutoff = first + timedelta(weeks=train_weeks)
+    cutoff -= timedelta(days=cutoff.weekday())
+
+    results = []
+    while cutoff + timedelta(weeks=horizon_weeks) <= last + timedelta(days=1):
+        end = cutoff + timedelta(weeks=horizon_weeks)
+        start = time.perf_counter()
+        model = RecurringSlotModel(weeks=train_weeks).fit(
+            [r for r in records if r.day < cutoff], until=cutoff)
+        days = [cutoff + timedelta(days=i) for i in range((end - cutoff).days)]
+        predicted_keys = {
+            class_key(record, day)
+            for day, record, _ in model.predict_slots(days, min_confidence=min_confidence,
+                                                      include_off_peak=True)
+        }
+        elapsed = time.perf_counter() - start
+
+        actual_keys = {class_key(r) for r in records if cutoff <= r.day < end}
+        hits = len(predicted_keys & actual_keys)
+        results.append({
+            "cutoff": cutoff.isoformat(),
+            "predicted": len(predicted_keys),
+            "actual": len(actual_keys),
+            "precision": hits / len(predicted_keys) if predicted_keys else 0.0,
+            "recall": hits / len(actual_keys) if actual_keys else 0.0,
+            "seconds": elapsed,
+        })
+        cutoff += timedelta(weeks=step_weeks)
+    return results
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "schedule.db"
+    with ScheduleStore(db_path) as store:
+        records = store.classes_between()
+
+    results = backtest(records)
+    if not results:
+        print(f"🛑 Not enough history in {db_path} to backtest")
+        sys.exit(1)
+
+    for r in results:
+        print(f"📅 {r['cutoff']}: precision {r['precision']:.2%} recall {r['recall']:.2%} "
+              f"({r['predicted']} predicted / {r['actual']} actual) in {r['seconds'] * 1000:.0f} ms")
+    n = len(results)
+    print(f"✅ Mean precision {sum(r['precision'] for r in results) / n:.2%}, "
+          f"mean recall {sum(r['recall'] for r in results) / n:.2%}, "
+          f"total {sum(r['seconds'] for r in results):.2f}s over {n} cutoffs")
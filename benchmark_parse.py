@@ -0,0 +1,68 @@
+import glob
+import sys
+import time
+import tracemalloc
+
+from schedule_parser import PARSERS, parse_records, seat_counts
+
+
+def load_fixtures(pattern="raw_*.html"):
+    fixtures = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            fixtures[path] = f.read()
+    return fixtures
+
+
+def benchmark(parser, pages, rounds=20):
+    """Return (records/sec, peak bytes) for parsing every page `rounds` times"""
+    records = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages:
+            records += len(parser(html))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for html in pages:
+        parser(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return records / elapsed, peak
+
+
+def check_parity(fixtures):
+    """Every backend must produce exactly the reference (bs4) records, and seat_counts the same seats"""
+    mismatches = []
+    for path, html in fixtures.items():
+        for with_links in (False, True):
+            expected = PARSERS["bs4"](html, with_links)
+            for name, parser in PARSERS.items():
+                if parser(html, with_links) != expected:
+                    mismatches.append((name, path))
+        seats = {r.registration_id: (r.action, r.status) for r in parse_records(html) if r.registration_id}
+        if seat_counts(html) != seats:
+            mismatches.append(("seat_counts", path))
+    return mismatches
+
+
+if __name__ == "__main__":
+    fixtures = load_fixtures(*sys.argv[1:2])
+    if not fixtures:
+        print("❌ No raw_*.html fixtures found")
+        sys.exit(1)
+
+    mismatches = check_parity(fixtures)
+    for name, path in mismatches:
+        print(f"❌ {name} output differs from the full parse for {path}")
+
+    pages = list(fixtures.values())
+    print(f"📄 {len(pages)} pages, {sum(len(p) for p in pages) // 1024} KB")
+    for name, parser in PARSERS.items():
+        rate, peak = benchmark(parser, pages)
+        print(f"⏱️  {name:5s} {rate:10.0f} records/sec  peak {peak / 1024 / 1024:.1f} MB")
+    rate, peak = benchmark(seat_counts, pages)
+    print(f"⏱️  seats {rate:10.0f} records/sec  peak {peak / 1024 / 1024:.1f} MB")
+
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,306 @@
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import requests
+
+from Solidcore_scraper import fetch_all_schedules, fetch_solidcore_schedule
+from benchmark_parse import benchmark, check_parity, load_fixtures
+from schedule_parser import PARSERS, parse_records, seat_counts
+from schedule_predictor import RecurringSlotModel
+from schedule_records import records_from_dicts
+from slot_search import SlotIndex, SlotQuery
+from snapshot_cache import Snapshot, SnapshotCache
+from stub_server import StubHandler, start_stub_server
+
+RESULTS_DIR = "benchmark_results"
+FIXTURE_DATES = ["2025-05-18", "2025-05-25"]
+# Metrics where a bigger number is better; everything else is a time or a size
+HIGHER_IS_BETTER = ("per_sec",)
+
+
+def percentiles(samples, points=(50, 90, 99)):
+    """Nearest-rank percentiles of `samples` as {"p50": ..., ...}"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{p}": None for p in points}
+    return {f"p{p}": ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+            for p in points}
+
+
+def bench_fetch(base_url, requests_total=200, workers=8):
+    """Sequential and concurrent fetch_solidcore_schedule throughput against the stub"""
+    url = f"{base_url}/assets/ajax/addMoreClassesStaticGrid.php"
+    session = requests.Session()
+    latencies = []
+    start = time.perf_counter()
+    for i in range(requests_total // 4):
+        t = time.perf_counter()
+        fetch_solidcore_schedule("chelsea", FIXTURE_DATES[i % 2], session=session, url=url)
+        latencies.append((time.perf_counter() - t) * 1000)
+    sequential = (requests_total // 4) / (time.perf_counter() - start)
+
+    dates = [FIXTURE_DATES[i % 2] for i in range(requests_total)]
+    start = time.perf_counter()
+    results = fetch_all_schedules(["chelsea"], dates, max_workers=workers, url=url)
+    concurrent = len(results) / (time.perf_counter() - start)
+    errors = sum(1 for r in results if r.error)
+    return {"sequential_per_sec": sequential, "concurrent_per_sec": concurrent,
+            "errors": errors, "latency_ms": percentiles(latencies)}
+
+
+def bench_parse(fixtures):
+    """Records/sec and peak memory per parser backend, plus seat extraction"""
+    pages = list(fixtures.values())
+    results = {}
+    for name, parser in PARSERS.items():
+        rate, peak = benchmark(parser, pages)
+        results[name] = {"records_per_sec": rate, "peak_bytes": peak}
+    rate, peak = benchmark(seat_counts, pages)
+    results["seat_counts"] = {"records_per_sec": rate, "peak_bytes": peak}
+    results["parity_mismatches"] = len(check_parity(fixtures))
+    return results
+
+
+def bench_predict(fixtures, weeks=12, rounds=20):
+    """RecurringSlotModel fit + one month of predictions over `weeks` weeks of history"""
+    base = [r for html in fixtures.values() for r in parse_records(html, "chelsea")]
+    with open("solidcore_schedule.json", "r") as f:
+        base += records_from_dicts(json.load(f), "downtown-brooklyn", date(2025, 5, 18))
+    # Replay the fixture weeks back in time to get a realistic amount of history
+    history = [dataclasses.replace(r, day=r.day - timedelta(weeks=2 * k))
+               for k in range(weeks // 2) for r in base if r.day is not None]
+    until = max(r.day for r in history) + timedelta(days=1)
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        model = RecurringSlotModel(weeks=weeks).fit(history, until=until)
+        predicted = model.predict_month(until.year, until.month)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    RecurringSlotModel(weeks=weeks).fit(history, until=until).predict_month(until.year, until.month)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"history_records": len(history), "predicted": len(predicted),
+            "ms": min(timings), "peak_bytes": peak}
+
+
+def bench_book(base_url, bookings=200, workers=16, booking_delay=0.02):
+    """Latency percentiles of concurrent ScheduleManager.book_class calls against the stub"""
+    from schedule_manager import ScheduleManager
+
+    StubHandler.booking_delay = booking_delay
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = ScheduleManager(os.path.join(tmp, "scheduled_classes.json"),
+                                  os.path.join(tmp, "solidcore_cookies.json"), connections=workers)
+        manager.booking_url = f"{base_url}/assets/ajax/postBook.php"
+        session = manager.sessions.session()
+        classes = [{"location": "chelsea", "registration_id": str(600000 + i)} for i in range(bookings)]
+
+        def book(class_info):
+            t = time.perf_counter()
+            ok = manager.book_class(class_info, session=session)
+            return ok, (time.perf_counter() - t) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(book, classes))
+        elapsed = time.perf_counter() - start
+        manager.close()
+    StubHandler.booking_delay = 0.0
+    latencies = [ms for _, ms in results]
+    return {"bookings_per_sec": bookings / elapsed, "failed": sum(1 for ok, _ in results if not ok),
+            "server_delay_ms": booking_delay * 1000, "latency_ms": percentiles(latencies)}
+
+
+def bench_snapshots(copies=16):
+    """Cold (parse + cache) vs cached load and query cost per archived snapshot page"""
+    queries = (Snapshot.full_classes, Snapshot.open_seats_by_day, Snapshot.teacher_load)
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = os.path.join(tmp, "archive")
+        os.makedirs(archive)
+        for i in range(copies):
+            for page in ["solidcore_schedule.html"] + [f"raw_{d}.html" for d in FIXTURE_DATES]:
+                shutil.copy(page, os.path.join(archive, f"{i}_{page}"))
+        cache = SnapshotCache(os.path.join(tmp, "cache"))
+        start = time.perf_counter()
+        snapshots = cache.load_all([archive])
+        cold = (time.perf_counter() - start) * 1000 / len(snapshots)
+
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for snapshot in cache.load_all([archive]):
+                for query in queries:
+                    query(snapshot)
+            timings.append((time.perf_counter() - start) * 1000 / len(snapshots))
+        cache_bytes = sum(os.path.getsize(os.path.join(cache.cache_dir, name))
+                          for name in os.listdir(cache.cache_dir))
+    return {"snapshots": len(snapshots), "cold_ms_per_snapshot": cold,
+            "cached_ms_per_snapshot": min(timings), "cache_bytes_per_snapshot": cache_bytes // len(snapshots)}
+
+
+def bench_journal(entries=2000):
+    """Journal append rate, plus a reload check: legacy classes keep their journaled updates"""
+    from schedule_journal import ScheduleJournal
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, "scheduled_classes.json")
+        with open(snapshot, "w") as f:
+            json.dump([{"location": "chelsea", "status": "scheduled", "registration_id": None}
+                       for _ in range(entries)], f)
+        journal = ScheduleJournal(snapshot, compact_every=entries * 2)
+        classes = journal.load()
+        start = time.perf_counter()
+        for i, class_info in enumerate(classes):
+            journal.update(class_info, status="booked", registration_id=str(600000 + i))
+        elapsed = time.perf_counter() - start
+        journal.close()
+
+        reloaded = ScheduleJournal(snapshot)
+        mismatches = sum(1 for c in reloaded.load() if c["status"] != "booked" or not c["registration_id"])
+        reloaded.close()
+    return {"appends_per_sec": entries / elapsed, "reload_mismatches": mismatches}
+
+
+def bench_search(fixtures, weeks=40, studios=12):
+    """SlotIndex build time and query latency over `weeks` weeks of `studios` studios"""
+    from studio_registry import StudioRegistry
+
+    registry = StudioRegistry(families=["Signature50", "Focus50", "Advanced50", "Advanced65", "Power30"])
+    slugs = [f"studio-{i}" for i in range(studios)]
+    for i, slug in enumerate(slugs):
+        registry.add_studio(slug, area="Manhattan" if i % 2 else "Brooklyn")
+    base = [r for html in fixtures.values() for r in parse_records(html)]
+    start = min(r.day for r in base)
+    offset = date.today() - timedelta(weeks=weeks // 2) - start
+    classes = [(dataclasses.replace(r, location=slug, day=r.day + offset + timedelta(weeks=k)), "scraped", 1.0)
+               for k in range(0, weeks, 2) for slug in slugs for r in base]
+
+    t = time.perf_counter()
+    index = SlotIndex(classes, registry=registry)
+    build = time.perf_counter() - t
+    queries = [
+        {"family": "Signature50", "days": "weekdays", "between": "6-8pm", "area": "Manhattan"},
+        {"family": "Focus50", "teacher": base[0].teacher, "days": "weekends"},
+        {"between": "7-10am", "location": slugs[0]},
+        {"family": "signature"},
+    ]
+    latencies = []
+    for _ in range(25):
+        for params in queries:
+            query = SlotQuery.from_params(params)
+            t = time.perf_counter()
+            index.search(query)
+            latencies.append((time.perf_counter() - t) * 1000)
+    return {"classes": len(index), "build_ms": build * 1000, "query_ms": percentiles(latencies)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(results, prefix=""):
+    """{"parse.lxml.records_per_sec": ...} for comparing two runs"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline, current, threshold=0.2):
+    """Print every metric's change; returns the metrics that got worse by more than `threshold`"""
+    old, new = flatten(baseline["results"]), flatten(current["results"])
+    regressions = []
+    for name in sorted(old.keys() & new.keys()):
+        if not old[name]:
+            continue
+        change = (new[name] - old[name]) / old[name]
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        marker = "❌" if worse > threshold else "  "
+        print(f"{marker} {name:45s} {old[name]:14.2f} -> {new[name]:14.2f} ({change:+.0%})")
+        if worse > threshold:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks against the checked-in fixtures")
+    parser.add_argument("--only", nargs="+", choices=["fetch", "parse", "predict", "book", "journal", "snapshots", "search"],
+                        help="run only these benchmarks")
+    parser.add_argument("--output", help=f"results file (default: {RESULTS_DIR}/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="regression threshold (default 0.2)")
+    args = parser.parse_args()
+    selected = args.only or ["fetch", "parse", "predict", "book", "journal", "snapshots", "search"]
+
+    fixtures = load_fixtures()
+    if not fixtures:
+        print("❌ No raw_*.html fixtures found")
+        sys.exit(1)
+
+    server, base_url = start_stub_server()
+    results = {}
+    try:
+        for name in selected:
+            start = time.perf_counter()
+            if name == "fetch":
+                results[name] = bench_fetch(base_url)
+            elif name == "parse":
+                results[name] = bench_parse(fixtures)
+            elif name == "predict":
+                results[name] = bench_predict(fixtures)
+            elif name == "book":
+                results[name] = bench_book(base_url)
+            elif name == "journal":
+                results[name] = bench_journal()
+            elif name == "snapshots":
+                results[name] = bench_snapshots()
+            elif name == "search":
+                results[name] = bench_search(fixtures)
+            print(f"⏱️  {name:8s} done in {time.perf_counter() - start:.1f}s: {json.dumps(results[name])}")
+    finally:
+        server.shutdown()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Saved {output}")
+
+    failed = bool(results.get("parse", {}).get("parity_mismatches")
+                  or results.get("journal", {}).get("reload_mismatches"))
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} metrics regressed by more than {args.threshold:.0%}")
+            failed = True
+    sys.exit(1 if failed else 0)
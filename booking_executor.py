@@ -0,0 +1,187 @@
+import datetime
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from schedule_records import WEEKDAYS, parse_clock
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BookingOutcome:
+    """What happened to one scheduled class"""
+    class_info: dict
+    status: str  # booked, waitlist, failed or skipped
+    attempts: int = 0
+    latency_ms: float = 0.0  # first attempt start to final answer
+    priority: float = 0.0
+    message: str = ""
+
+
+class ContentionRanker:
+    """Scores wishlist classes by how fast their slot usually sells out
+
+    Uses the sell-out history in schedule.db (see schedule_analytics) when
+    it is available; otherwise every class scores 0 and the wishlist order
+    is kept.
+    """
+
+    def __init__(self, db_path="schedule.db"):
+        self.scores = {}
+        if not os.path.exists(db_path):
+            return
+        try:
+            from schedule_analytics import ScheduleHistory, slot_stats
+            from schedule_store import ScheduleStore
+        except ImportError:  # numpy is optional here
+            return
+        with ScheduleStore(db_path) as store:
+            history = ScheduleHistory.from_store(store)
+        if not len(history):
+            return
+        stats = slot_stats(history)
+        for i in range(len(stats["classes"])):
+            hours = stats["hours_to_sellout"][i]
+            # Sold out more often, and sooner, means more contended
+            score = float(stats["sellout_rate"][i]) + (1.0 / (1.0 + hours) if hours == hours else 0.0)
+            key = (str(stats["location"][i]), int(stats["weekday"][i]), int(stats["start_min"][i]))
+            self.scores[key] = max(score, self.scores.get(key, 0.0))
+
+    def __call__(self, class_info):
+        day = (class_info.get('day_of_week') or "").capitalize()
+        if day not in WEEKDAYS:
+            return 0.0
+        key = (class_info['location'], WEEKDAYS.index(day), parse_clock(class_info['time']))
+        return self.scores.get(key, 0.0)
+
+
+class BatchedSaver:
+    """Coalesces wishlist journal fsyncs onto a background thread
+
+    Booking threads only append to the journal and call mark_dirty(); the
+    journal is fsynced at most once per `interval` and once more on close().
+    """
+
+    def __init__(self, save, interval=0.5):
+        self.save = save
+        self.interval = interval
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self):
+        self._dirty.set()
+
+    def _flush(self):
+        if self._dirty.is_set():
+            self._dirty.clear()
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"Error syncing scheduled classes: {str(e)}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._flush()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self._flush()
+
+
+class BookingExecutor:
+    """Books many classes concurrently, most contended first
+
+    Requests are submitted in contention order, so when there are more
+    classes than workers the hardest slots go out first. Transient
+    failures are retried with backoff while the class's deadline (counted
+    from its first attempt) allows another. A class the site refuses
+    (usually because it is full) falls back to "waitlist" for the
+    availability monitor to watch; any other error, such as a rejected
+    login, is reported as "failed" and the class stays scheduled.
+    """
+
+    def __init__(self, manager, session=None, max_workers=16, deadline_seconds=30,
+                 max_attempts=5, backoff=0.1, ranker=None, save_interval=0.5):
+        self.manager = manager
+        self.session = session
+        self.max_workers = max_workers
+        self.deadline_seconds = deadline_seconds
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.ranker = ranker or ContentionRanker()
+        self.save_interval = save_interval
+
+    def _book(self, class_info, priority, go, saver):
+        go.wait()
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.deadline_seconds
+        attempts, message = 0, ""
+        while True:
+            attempts += 1
+            attempt_start = time.perf_counter()
+            outcome, message = self.manager.try_book_class(class_info, session=self.session)
+            attempt_time = time.perf_counter() - attempt_start
+            if outcome == "booked":
+                status = 'booked'
+                break
+            if outcome == "refused":
+                status = 'waitlist'
+                break
+            if outcome != "transient":
+                status = 'failed'
+                break
+            delay = self.backoff * (2 ** (attempts - 1))
+            if attempts >= self.max_attempts or time.monotonic() + delay + attempt_time > deadline:
+                status = 'failed'
+                break
+            time.sleep(delay)
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        fields = {'last_checked': datetime.datetime.now().isoformat()}
+        if status != 'failed':
+            fields['status'] = status
+        if status != 'booked':
+            fields['last_error'] = message
+        self.manager.update_scheduled_class(class_info, **fields)
+        saver.mark_dirty()
+        logger.info(f"{status}: {class_info['location']} {class_info['registration_id']} "
+                    f"after {attempts} attempt(s) in {latency_ms:.1f} ms")
+        return BookingOutcome(class_info, status, attempts, latency_ms, priority, message)
+
+    def run(self, classes):
+        """Book every class that has a registration ID; returns outcomes in priority order"""
+        ranked = sorted(((self.ranker(c), i, c) for i, c in enumerate(classes)),
+                        key=lambda item: (-item[0], item[1]))
+        outcomes = [BookingOutcome(c, 'skipped', priority=p, message="no registration ID")
+                    for p, _, c in ranked if not c.get('registration_id')]
+        ready = [(p, c) for p, _, c in ranked if c.get('registration_id')]
+        if not ready:
+            return outcomes
+
+        saver = BatchedSaver(self.manager.sync_scheduled_classes, self.save_interval)
+        go = threading.Event()
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ready))) as pool:
+                futures = [pool.submit(self._book, c, p, go, saver) for p, c in ready]
+                go.set()
+                booked = [f.result() for f in futures]
+        finally:
+            saver.close()
+        return booked + outcomes
+
+
+def summarize(outcomes):
+    """One log line per class plus totals"""
+    for o in outcomes:
+        logger.info(f"{o.status:8s} {o.class_info['location']} {o.class_info.get('day_of_week')} "
+                    f"{o.class_info.get('time')} priority={o.priority:.2f} "
+                    f"attempts={o.attempts} {o.latency_ms:.1f} ms")
+    booked = sum(1 for o in outcomes if o.status == 'booked')
+    logger.info(f"Booked {booked}/{len(outcomes)} classes")
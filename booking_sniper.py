@@ -0,0 +1,172 @@
+import datetime
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+import metrics
+from booking_executor import BookingExecutor, ContentionRanker, summarize
+from registration_index import build_registration_index
+
+logger = logging.getLogger(__name__)
+
+# How long past the release the login must stay valid
+LOGIN_HEADROOM = datetime.timedelta(minutes=15)
+
+
+def sleep_until(instant, spin_window=0.05):
+    """Sleep until a wall-clock datetime, spinning over the last few ms for precision"""
+    while True:
+        remaining = (instant - datetime.datetime.now()).total_seconds()
+        if remaining <= 0:
+            return
+        if remaining > spin_window:
+            # Wake up early and re-check, so a long sleep can't overshoot
+            time.sleep(min(remaining - spin_window, 60))
+        else:
+            time.sleep(0)
+
+
+@metrics.timed("connection_warmup")
+def warm_session(session, url, connections):
+    """Open `connections` keep-alive sockets to `url`'s host ahead of time"""
+    parsed = urlparse(url)
+    warm_url = f"{parsed.scheme}://{parsed.netloc}/"
+    gate = threading.Barrier(connections)
+
+    def touch(_):
+        # Hold every request until all threads are ready, so each one
+        # needs its own connection instead of reusing the first
+        try:
+            gate.wait(timeout=10)
+        except threading.BrokenBarrierError:
+            pass
+        try:
+            session.head(warm_url, timeout=10)
+        except requests.RequestException as e:
+            logger.warning(f"Warm-up request failed: {str(e)}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        list(pool.map(touch, range(connections)))
+    logger.info(f"Warmed {connections} connections in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+class ReleaseSniper:
+    """Books every scheduled class the moment the monthly schedule goes live
+
+    A few minutes before the release it makes sure the login cookies will
+    outlast the release (refreshing them if not); shortly before, it opens
+    keep-alive connections on the manager's shared session to the booking
+    host. At the release instant (or, given a ReleaseWatcher, as soon as
+    it sees the new weeks appear) it resolves any missing registration IDs
+    from a single schedule fetch and hands every booking to a
+    BookingExecutor, which logs each attempt's latency. If the watcher
+    saw nothing and some classes weren't on the schedule yet, it waits up
+    to a grace period for a late detection and books those then.
+    """
+
+    def __init__(self, manager, release_at=None, warmup_seconds=30, max_connections=16,
+                 schedule_url=None, watcher=None, refresh_seconds=300, release_grace_seconds=60):
+        self.manager = manager
+        self.watcher = watcher
+        self.release_at = (release_at or (watcher and watcher.release_at)
+                           or manager.get_schedule_release_date())
+        self.warmup_seconds = warmup_seconds
+        self.refresh_seconds = refresh_seconds
+        self.release_grace = datetime.timedelta(seconds=release_grace_seconds)
+        self.max_connections = max_connections
+        self.schedule_url = schedule_url
+        self.session = None
+
+    def build_session(self):
+        """The manager's pooled session, its login checked to outlast the release"""
+        self.manager.sessions.ensure_fresh(by=self.release_at + LOGIN_HEADROOM)
+        return self.manager.sessions.session()
+
+    def warm(self, connections):
+        """Open `connections` keep-alive sockets to the booking host ahead of time"""
+        warm_session(self.session, self.manager.booking_url, connections)
+
+    def pending_classes(self):
+        """Scheduled classes that only this release can make bookable"""
+        return [c for c in self.manager.scheduled_classes
+                if c['status'] == 'scheduled' and self.manager.awaits_release(c)]
+
+    def resolve_ids(self, classes):
+        """Fill missing registration IDs from one concurrent schedule fetch"""
+        missing = [c for c in classes if not c['registration_id']]
+        if not missing:
+            return
+        start = time.perf_counter()
+        kwargs = {"url": self.schedule_url} if self.schedule_url else {}
+        index = build_registration_index({c['location'] for c in missing},
+                                         registry=self.manager.registry,
+                                         session=self.session, **kwargs)
+        today = datetime.date.today()
+        window_start = self.manager.release_window_start(self.release_at)
+        for class_info in missing:
+            registration_id = index.resolve(class_info, after=today, window_start=window_start)
+            if registration_id:
+                self.manager.update_scheduled_class(class_info, registration_id=registration_id,
+                                                    last_checked=datetime.datetime.now().isoformat())
+        logger.info(f"Resolved registration IDs in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def fire(self, classes, ranker=None):
+        """Send every booking at once, most contended first; returns BookingOutcomes"""
+        executor = BookingExecutor(self.manager, session=self.session,
+                                   max_workers=self.max_connections, ranker=ranker)
+        outcomes = executor.run(classes)
+        summarize(outcomes)
+        return outcomes
+
+    def wait_until(self, instant):
+        """Sleep until `instant`, or until the watcher detects the release; returns the Detection"""
+        if self.watcher is not None:
+            # An early release cuts the wait short; a watcher that stopped without one doesn't
+            detection = self.watcher.wait(max(0.0, (instant - datetime.datetime.now()).total_seconds()))
+            if detection:
+                return detection
+        sleep_until(instant)
+        return None
+
+    def run(self):
+        """Wait for the release, then book everything; returns BookingOutcomes"""
+        classes = self.pending_classes()
+        if not classes:
+            logger.info("Nothing scheduled to book")
+            return []
+
+        warm_at = self.release_at - datetime.timedelta(seconds=self.warmup_seconds)
+        refresh_at = min(warm_at, self.release_at - datetime.timedelta(seconds=self.refresh_seconds))
+        logger.info(f"Waiting until {warm_at} to warm up for the {self.release_at} release")
+        self.wait_until(refresh_at)
+        # A browser refresh takes seconds, so do it well before warming up
+        self.manager.sessions.ensure_fresh(by=self.release_at + LOGIN_HEADROOM)
+        self.wait_until(warm_at)
+
+        connections = min(max(len(classes), 2), self.max_connections)
+        self.session = self.build_session()
+        self.warm(connections)
+        # Loading the sell-out history takes a while; don't do it at the release instant
+        ranker = ContentionRanker()
+
+        # Fire early only on a real detection; otherwise fire at release_at
+        detection = self.wait_until(self.release_at)
+        if detection:
+            logger.info(f"Release detected at {detection.detected_at} ({detection.slug} {detection.date})")
+        self.resolve_ids(classes)
+        outcomes = self.fire(classes, ranker)
+
+        unresolved = [o.class_info for o in outcomes if o.status == 'skipped']
+        if self.watcher is not None and not detection and unresolved:
+            # The schedule may just be late; give the watcher a grace period to see it
+            logger.warning(f"{len(unresolved)} classes not on the schedule yet; "
+                           f"watching for up to {self.release_grace} more")
+            if self.watcher.wait(self.release_grace.total_seconds()):
+                self.resolve_ids(unresolved)
+                outcomes = [o for o in outcomes if o.status != 'skipped'] + self.fire(unresolved, ranker)
+        return outcomes
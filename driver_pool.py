@@ -0,0 +1,168 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+from metrics import timed, timer
+from session_manager import COOKIES_FILE, load_cookies, save_cookies
+
+logger = logging.getLogger(__name__)
+
+
+def headless_chrome():
+    """Default driver factory: a fresh headless Chrome"""
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--no-sandbox')
+    return webdriver.Chrome(options=chrome_options)
+
+
+def login_and_save_cookies(cookies_file=COOKIES_FILE, login_url="https://solidcore.co/auth/login"):
+    """Open a visible Chrome for a manual login (2FA included) and save its cookies"""
+    driver = webdriver.Chrome(options=Options())
+    try:
+        driver.get(login_url)
+        input("Log in in the Chrome window, then press Enter here to save the cookies...")
+        cookies = driver.get_cookies()
+        path = save_cookies(cookies_file, cookies)
+        logger.info(f"Saved {len(cookies)} cookies to {path}")
+    finally:
+        driver.quit()
+
+
+class DriverPool:
+    """A small pool of warm, already-authenticated WebDrivers
+
+    Drivers are created once, loaded with the saved cookies and handed out
+    with `with pool.driver() as driver:`. A driver is recycled (quit and
+    replaced) when it raises a WebDriverException, fails a liveness check,
+    has served `max_uses` callers, or its JS heap grows past
+    `max_heap_bytes`.
+    """
+
+    def __init__(self, size=2, factory=headless_chrome, cookies_file=COOKIES_FILE,
+                 cookie_url="https://solidcore.co", max_uses=50, max_heap_bytes=512 * 1024 * 1024,
+                 acquire_timeout=60):
+        self.size = size
+        self.factory = factory
+        self.cookies_file = cookies_file
+        self.cookie_url = cookie_url
+        self.max_uses = max_uses
+        self.max_heap_bytes = max_heap_bytes
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def warm(self, count=None):
+        """Start drivers ahead of time so the first callers don't pay for a cold start"""
+        for _ in range(min(count or self.size, self.size) - self._created):
+            driver = self._create()
+            if driver is not None:
+                self._idle.put(driver)
+
+    @timed("cookie_load", source="driver_pool")
+    def _load_cookies(self):
+        return load_cookies(self.cookies_file) if self.cookies_file else []
+
+    def _create(self):
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            with timer("chrome_start"):
+                driver = self.factory()
+            cookies = self._load_cookies()
+            if cookies:
+                driver.get(self.cookie_url)
+                for cookie in cookies:
+                    driver.add_cookie(cookie)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        self._uses[id(driver)] = 0
+        logger.info(f"Started pooled driver ({self._created}/{self.size})")
+        return driver
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        with self._lock:
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting driver: {str(e)}")
+
+    def _healthy(self, driver):
+        try:
+            heap = driver.execute_script(
+                "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : 0")
+        except WebDriverException:
+            return False
+        if heap and heap > self.max_heap_bytes:
+            logger.info(f"Recycling driver using {heap / 1024 / 1024:.0f} MB of JS heap")
+            return False
+        return self._uses.get(id(driver), 0) < self.max_uses
+
+    def acquire(self):
+        """Take an idle driver, starting one if the pool has room"""
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._create()
+                if driver is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("No WebDriver became available")
+                    try:
+                        driver = self._idle.get(timeout=remaining)
+                    except queue.Empty:
+                        raise TimeoutError("No WebDriver became available")
+            if self._healthy(driver):
+                self._uses[id(driver)] += 1
+                return driver
+            self._discard(driver)
+
+    def release(self, driver, broken=False):
+        """Return a driver to the pool, or replace it if it broke"""
+        if broken or self._closed:
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def driver(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        except WebDriverException:
+            self.release(driver, broken=True)
+            raise
+        except BaseException:
+            self.release(driver)
+            raise
+        else:
+            self.release(driver)
+
+    def close(self):
+        """Quit every idle driver; drivers still in use are quit when released"""
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
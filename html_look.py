@@ -1,32 +1,31 @@
-from bs4 import BeautifulSoup
-import re
+import argparse
+import sys
 
-# Load the HTML content (assumed to be saved as a variable called html_content)
-with open("solidcore_schedule.html", "r", encoding="utf-8") as file:
-    html_content = file.read()
+from snapshot_cache import CACHE_DIR, Snapshot, SnapshotCache
 
-soup = BeautifulSoup(html_content, "html.parser")
+QUERIES = {
+    "full": Snapshot.full_classes,
+    "open": Snapshot.open_seats_by_day,
+    "teachers": Snapshot.teacher_load,
+}
 
-# Dictionary to hold the results
-results = {}
 
-# Iterate over each schedule-day block
-for day_block in soup.select(".schedule-day"):
-    # Get day header
-    header = day_block.select_one(".schedule-day-header")
-    if not header:
-        continue
-    day = header.get_text(strip=True)
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="look", description="Query saved schedule pages; each page is parsed once into a cache")
+    parser.add_argument("paths", nargs="*", default=["solidcore_schedule.html"],
+                        help="HTML files, or directories of them (default: solidcore_schedule.html)")
+    parser.add_argument("--query", choices=list(QUERIES), default="full",
+                        help="full classes by day, open seats by day, or per-teacher load (default: full)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"where parsed pages are kept (default: {CACHE_DIR})")
+    args = parser.parse_args(argv)
 
-    # Find classes where "class-status" contains "0 of"
-    full_classes = []
-    for class_item in day_block.select(".class"):
-        status = class_item.select_one(".class-status")
-        time_div = class_item.select_one(".class-time")
-        if status and time_div and "0 of" in status.get_text():
-            full_classes.append(time_div.get_text(strip=True))
+    snapshots = SnapshotCache(args.cache_dir).load_all(args.paths)
+    for snapshot in snapshots:
+        result = QUERIES[args.query](snapshot)
+        print(result if len(snapshots) == 1 else f"{snapshot.source}: {result}")
 
-    if full_classes:
-        results[day] = full_classes
 
-print(results)
+if __name__ == "__main__":
+    main()
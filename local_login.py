@@ -1,5 +1,4 @@
-from solidcore_schedule_scraper import login_and_save_cookies
-import os
+from driver_pool import login_and_save_cookies
 
 def main():
     print("Starting manual login process...")
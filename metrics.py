@@ -0,0 +1,190 @@
+import atexit
+import cProfile
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "solidcore"
+# Histogram buckets in seconds, from a parse to a slow Chrome start
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_ENV = "SOLIDCORE_METRICS"
+PROFILE_ENV = "SOLIDCORE_PROFILE"
+
+
+def escape_label(value):
+    """A label value escaped for the Prometheus text format"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Thread-safe counters and timers, exportable as Prometheus text or JSON
+
+    A metric is identified by its name plus optional labels, e.g.
+    timer("booking", outcome="booked"). Recording costs one lock and a few
+    additions, so it is fine on hot paths.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}  # key -> [count, sum, max, bucket counts...]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def count(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            stats = self.timers.get(key)
+            if stats is None:
+                stats = self.timers[key] = [0, 0.0, 0.0] + [0] * len(BUCKETS)
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats[3 + i] += 1
+                    break
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time a block; an exception is recorded with error="true" and re-raised"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(name, time.perf_counter() - start, error="true", **labels)
+            raise
+        self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator form of timer()"""
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+
+    def to_json(self):
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            timers = [{"name": name, "labels": dict(labels), "count": stats[0],
+                       "sum_seconds": stats[1], "max_seconds": stats[2],
+                       "mean_seconds": stats[1] / stats[0] if stats[0] else 0.0}
+                      for (name, labels), stats in sorted(self.timers.items())]
+        return {"counters": counters, "timers": timers}
+
+    def to_prometheus(self):
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            timers = sorted((key, list(stats)) for key, stats in self.timers.items())
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f"{PREFIX}_{name}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{fmt(labels)} {value}")
+        for (name, labels), stats in timers:
+            metric = f"{PREFIX}_{name}_seconds"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, hits in zip(BUCKETS, stats[3:]):
+                cumulative += hits
+                lines.append(f"{metric}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{metric}_bucket{fmt(labels, [('le', '+Inf')])} {stats[0]}")
+            lines.append(f"{metric}_sum{fmt(labels)} {stats[1]:.6f}")
+            lines.append(f"{metric}_count{fmt(labels)} {stats[0]}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write Prometheus text (.prom/.txt) or JSON (anything else), atomically"""
+        if path.endswith((".prom", ".txt")):
+            body = self.to_prometheus()
+        else:
+            body = json.dumps(self.to_json(), indent=2)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(body)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+
+
+METRICS = Metrics()
+count = METRICS.count
+observe = METRICS.observe
+timer = METRICS.timer
+timed = METRICS.timed
+
+
+@contextmanager
+def profiling(prefix):
+    """cProfile + tracemalloc around a block; writes <prefix>.prof and <prefix>.tracemalloc
+
+    cProfile only sees the calling thread; tracemalloc sees them all. Inspect with `python -m pstats <prefix>.prof` and
+    tracemalloc.Snapshot.load("<prefix>.tracemalloc").
+    """
+    profiler = cProfile.Profile()
+    tracemalloc.start(25)
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profiler.dump_stats(f"{prefix}.prof")
+        snapshot.dump(f"{prefix}.tracemalloc")
+        logger.info(f"Profile written to {prefix}.prof and {prefix}.tracemalloc "
+                    f"(peak traced memory {peak / 1024 / 1024:.1f} MB)")
+
+
+def configure(metrics_path=None, profile_prefix=None):
+    """Export metrics at exit and optionally profile the whole run
+
+    Defaults come from $SOLIDCORE_METRICS (e.g. metrics.prom or
+    metrics.json) and $SOLIDCORE_PROFILE (an output prefix), so any entry
+    point can be instrumented without code changes.
+    """
+    metrics_path = metrics_path or os.environ.get(METRICS_ENV)
+    profile_prefix = profile_prefix or os.environ.get(PROFILE_ENV)
+    if profile_prefix:
+        session = profiling(profile_prefix)
+        session.__enter__()
+        atexit.register(session.__exit__, None, None, None)
+    if metrics_path:
+        # Registered after profiling, so it runs first at exit
+        atexit.register(METRICS.write, metrics_path)
@@ -0,0 +1,196 @@
+import datetime
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import metrics
+from booking_executor import BookingExecutor, ContentionRanker, summarize
+from booking_sniper import LOGIN_HEADROOM, sleep_until, warm_session
+from registration_index import build_registration_index
+from schedule_manager import ScheduleManager
+
+logger = logging.getLogger(__name__)
+
+USERS_FILE = "users.json"
+USERS_DIR = "users"
+
+
+@dataclass
+class UserAccount:
+    """One solidcore account with its own wishlist and login cookies"""
+    user_id: str
+    schedule_file: str = ""
+    cookies_file: str = ""
+
+    def __post_init__(self):
+        user_dir = os.path.join(USERS_DIR, self.user_id)
+        self.schedule_file = self.schedule_file or os.path.join(user_dir, "scheduled_classes.json")
+        self.cookies_file = self.cookies_file or os.path.join(user_dir, "solidcore_cookies.json")
+
+
+def load_users(path=USERS_FILE):
+    """Accounts listed in users.json as [{"user_id": ..., "schedule_file": ..., "cookies_file": ...}]"""
+    with open(path, 'r') as f:
+        return [UserAccount(**user) for user in json.load(f)]
+
+
+def class_identity(class_info):
+    """Wishlist entries that name the same class share one registration ID"""
+    return (class_info['location'], class_info.get('date') or class_info['day_of_week'],
+            class_info['time'], class_info['class_type'], class_info.get('coach'))
+
+
+class MultiUserEngine:
+    """Books many users' wishlists from one process
+
+    Every (studio, week) schedule is fetched and parsed once into a single
+    RegistrationIndex shared by all users, and each distinct class is
+    resolved once no matter how many users want it. Bookings then run for
+    all users at once, each user through their own ScheduleManager (for
+    their journal) and that manager's pooled, authenticated session. The
+    contention ranking is also computed once and shared.
+    """
+
+    def __init__(self, users, connections_per_user=4, max_users_in_flight=32, schedule_url=None):
+        self.users = list(users)
+        self.connections_per_user = connections_per_user
+        self.max_users_in_flight = max_users_in_flight
+        self.schedule_url = schedule_url
+        self.managers = {}
+        for user in self.users:
+            os.makedirs(os.path.dirname(user.schedule_file) or ".", exist_ok=True)
+            self.managers[user.user_id] = ScheduleManager(user.schedule_file, user.cookies_file,
+                                                          connections=connections_per_user)
+        self.sessions = {}
+        self.ranker = None
+
+    def pending(self):
+        """(user_id, class_info) for every class still waiting to be booked"""
+        return [(user_id, c) for user_id, manager in self.managers.items()
+                for c in manager.scheduled_classes if c['status'] == 'scheduled']
+
+    def build_sessions(self, release_at=None):
+        """Warm up the pooled session of every user with pending classes
+
+        Each user's login is refreshed first if it would expire before
+        `release_at` (or soon, without one).
+        """
+        users = [user for user in self.users if user.user_id not in self.sessions and any(
+            c['status'] == 'scheduled' for c in self.managers[user.user_id].scheduled_classes)]
+
+        def build(user):
+            manager = self.managers[user.user_id]
+            manager.sessions.ensure_fresh(by=release_at and release_at + LOGIN_HEADROOM)
+            session = manager.sessions.session()
+            warm_session(session, manager.booking_url, self.connections_per_user)
+            return session
+
+        if users:
+            with ThreadPoolExecutor(max_workers=min(self.max_users_in_flight, len(users))) as pool:
+                for user, session in zip(users, pool.map(build, users)):
+                    self.sessions[user.user_id] = session
+
+    def resolve_ids(self, release_at=None):
+        """Fill missing registration IDs for every user from one shared fetch
+
+        Weekday-only entries resolve into the schedule published at
+        `release_at` (default: the latest release). Returns the number of
+        distinct classes resolved.
+        """
+        missing = {}
+        for user_id, class_info in self.pending():
+            if not class_info['registration_id']:
+                missing.setdefault(class_identity(class_info), []).append((user_id, class_info))
+        if not missing:
+            return 0
+
+        start = time.perf_counter()
+        kwargs = {"url": self.schedule_url} if self.schedule_url else {}
+        any_manager = next(iter(self.managers.values()))
+        index = build_registration_index({key[0] for key in missing},
+                                         registry=any_manager.registry, **kwargs)
+        today = datetime.date.today()
+        window_start = any_manager.release_window_start(release_at)
+        now = datetime.datetime.now().isoformat()
+        resolved = 0
+        for entries in missing.values():
+            registration_id = index.resolve(entries[0][1], after=today, window_start=window_start)
+            if not registration_id:
+                continue
+            resolved += 1
+            for user_id, class_info in entries:
+                self.managers[user_id].update_scheduled_class(
+                    class_info, registration_id=registration_id, last_checked=now)
+        logger.info(f"Resolved {resolved}/{len(missing)} distinct classes for "
+                    f"{len(self.managers)} users in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return resolved
+
+    def book_user(self, user_id):
+        manager = self.managers[user_id]
+        pending = [c for c in manager.scheduled_classes if c['status'] == 'scheduled']
+        if not pending:
+            return []
+        session = self.sessions.get(user_id)
+        if session is None:
+            session = self.sessions[user_id] = manager.sessions.session()
+        executor = BookingExecutor(manager, session=session,
+                                   max_workers=self.connections_per_user, ranker=self.ranker)
+        return executor.run(pending)
+
+    def book(self):
+        """Book every user's pending classes concurrently; returns {user_id: outcomes}"""
+        if self.ranker is None:
+            self.ranker = ContentionRanker()
+        user_ids = [user_id for user_id, manager in self.managers.items()
+                    if any(c['status'] == 'scheduled' for c in manager.scheduled_classes)]
+        if not user_ids:
+            return {}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(self.max_users_in_flight, len(user_ids))) as pool:
+            results = dict(zip(user_ids, pool.map(self.book_user, user_ids)))
+        booked = sum(o.status == 'booked' for outcomes in results.values() for o in outcomes)
+        logger.info(f"Booked {booked} classes for {len(user_ids)} users "
+                    f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return results
+
+    def run(self, release_at=None, warmup_seconds=30):
+        """Optionally wait for the release, then resolve and book for everyone"""
+        if not self.pending():
+            logger.info("Nothing scheduled to book")
+            return {}
+        self.ranker = ContentionRanker()
+        if release_at is not None:
+            sleep_until(release_at - datetime.timedelta(seconds=warmup_seconds))
+        self.build_sessions(release_at)
+        if release_at is not None:
+            sleep_until(release_at)
+        self.resolve_ids(release_at)
+        return self.book()
+
+    def close(self):
+        # Each manager closes its own session
+        for manager in self.managers.values():
+            manager.close()
+        self.sessions = {}
+
+
+def main(argv=None):
+    metrics.configure()
+    engine = MultiUserEngine(load_users(*(argv or [])[:1]))
+    try:
+        any_manager = next(iter(engine.managers.values()), None)
+        release_at = None
+        if any_manager and not any_manager.check_schedule_released():
+            release_at = any_manager.get_schedule_release_date()
+        for user_id, outcomes in engine.run(release_at).items():
+            logger.info(f"User {user_id}:")
+            summarize(outcomes)
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
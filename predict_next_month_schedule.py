@@ -1,91 +1,68 @@
 import json
-from datetime import datetime, timedelta
-import calendar
 import os
+import sys
+import time
+from datetime import date, timedelta
 
-# Load the original schedule
-with open('solidcore_schedule.json', 'r') as f:
-    data = json.load(f)
+import metrics
+from schedule_predictor import RecurringSlotModel, next_month
+from schedule_records import records_from_dicts
+from schedule_store import ScheduleStore
 
-# 1. Extract all classes from the week of 5/18–5/24 (inclusive)
-TEMPLATE_MONTH = 5
-TEMPLATE_START_DAY = 18
-TEMPLATE_END_DAY = 24
-TEMPLATE_YEAR = datetime.today().year
+HISTORY_WEEKS = 12
+MIN_CONFIDENCE = 0.5
 
-template_classes_by_weekday = {i: [] for i in range(7)}
-for item in data:
-    date_str = item['date']
-    try:
-        dt = datetime.strptime(date_str, '%m/%d')
-        dt = dt.replace(year=TEMPLATE_YEAR)
-    except ValueError:
-        try:
-            dt = datetime.strptime(date_str, '%Y-%m-%d')
-        except ValueError:
-            continue
-    if dt.month == TEMPLATE_MONTH and TEMPLATE_START_DAY <= dt.day <= TEMPLATE_END_DAY:
-        weekday = dt.weekday()
-        template_classes_by_weekday[weekday].append(item)
 
-# 2. For each week in the next month, for each day, if that day matches a weekday in the template week, copy all classes from that weekday
-now = datetime.today()
-if now.month == 12:
-    next_month = 1
-    next_year = now.year + 1
-else:
-    next_month = now.month + 1
-    next_year = now.year
+def load_history(db_path="schedule.db", json_path="solidcore_schedule.json", weeks=HISTORY_WEEKS):
+    """Scrape history from the SQLite store, falling back to the latest JSON scrape"""
+    if os.path.exists(db_path):
+        with ScheduleStore(db_path) as store:
+            records = store.classes_between(since=date.today() - timedelta(weeks=weeks + 5))
+        if records:
+            return records, db_path
+    with open(json_path, 'r') as f:
+        return records_from_json(json.load(f)), json_path
 
-_, last_day = calendar.monthrange(next_year, next_month)
-dates_in_next_month = [datetime(next_year, next_month, day) for day in range(1, last_day+1)]
 
-predicted = []
-for dt in dates_in_next_month:
-    weekday = dt.weekday()
-    for orig in template_classes_by_weekday.get(weekday, []):
-        new_item = orig.copy()
-        new_item['date'] = dt.strftime('%m/%d')  # MM/DD format
-        new_item['status'] = 'predicted'
-        predicted.append(new_item)
+def records_from_json(items):
+    """Records from a JSON scrape, dropping any whose guessed date lands on the wrong weekday"""
+    records = []
+    mismatched = unanchored = 0
+    for item, record in zip(items, records_from_dicts(items)):
+        day_of_week = item.get("day_of_week")
+        if day_of_week and record.day and record.day.strftime("%A") != day_of_week.capitalize():
+            mismatched += 1
+            continue
+        unanchored += not item.get("week_of") and not day_of_week
+        records.append(record)
+    if mismatched:
+        print(f"⚠️  Skipped {mismatched} classes whose inferred date falls on the wrong weekday")
+    if unanchored:
+        print(f"⚠️  {unanchored} classes have no year or weekday; their dates are guessed relative to today. "
+              f"Re-scrape to record the year.")
+    return records
 
-# Remove all classes with 'Off-Peak' in their name
-predicted = [item for item in predicted if 'Off-Peak' not in item.get('name', '')]
 
-# Only allow these times for each day (from html_look.py output)
-allowed_times = {
-    'Sunday': ['1:15pm - 2:05pm (50 min)', '3:00pm - 3:50pm (50 min)', '3:15pm - 4:05pm (50 min)', '5:15pm - 6:05pm (50 min)', '6:15pm - 7:05pm (50 min)', '7:15pm - 8:05pm (50 min)', '8:15pm - 9:05pm (50 min)'],
-    'Monday': ['7:05am - 7:55am (50 min)', '8:05am - 8:55am (50 min)', '9:05am - 9:55am (50 min)', '10:05am - 10:55am (50 min)', '10:15am - 11:05am (50 min)', '11:05am - 11:55am (50 min)', '11:15am - 12:05pm (50 min)'],
-    'Tuesday': ['6:05am - 6:55am (50 min)', '6:15am - 7:05am (50 min)', '7:05am - 7:55am (50 min)', '7:15am - 8:05am (50 min)', '8:05am - 8:55am (50 min)', '8:15am - 9:05am (50 min)', '11:15am - 12:05pm (50 min)', '1:05pm - 1:55pm (50 min)', '2:15pm - 3:05pm (50 min)', '3:15pm - 4:05pm (50 min)', '5:15pm - 6:05pm (50 min)', '5:30pm - 6:20pm (50 min)', '6:15pm - 7:05pm (50 min)', '6:30pm - 7:20pm (50 min)', '7:15pm - 8:05pm (50 min)', '7:30pm - 8:20pm (50 min)', '8:30pm - 9:20pm (50 min)', '9:15pm - 10:05pm (50 min)', '10:15pm - 11:05pm (50 min)'],
-    'Wednesday': ['6:05am - 6:55am (50 min)', '6:15am - 7:05am (50 min)', '7:05am - 7:55am (50 min)', '7:15am - 8:05am (50 min)', '8:05am - 8:55am (50 min)', '8:15am - 9:05am (50 min)', '10:15am - 11:05am (50 min)', '2:15pm - 3:05pm (50 min)', '3:15pm - 4:05pm (50 min)', '5:15pm - 6:05pm (50 min)', '5:30pm - 6:20pm (50 min)', '6:15pm - 7:05pm (50 min)', '6:30pm - 7:20pm (50 min)', '7:15pm - 8:05pm (50 min)', '7:30pm - 8:20pm (50 min)'],
-    'Thursday': ['6:05am - 6:55am (50 min)', '6:15am - 7:05am (50 min)', '7:05am - 7:55am (50 min)', '7:15am - 8:05am (50 min)', '8:05am - 8:55am (50 min)', '8:15am - 9:05am (50 min)', '12:15pm - 12:45pm (30 min)', '3:15pm - 4:05pm (50 min)', '5:15pm - 6:05pm (50 min)', '5:30pm - 6:20pm (50 min)', '6:15pm - 7:05pm (50 min)', '6:30pm - 7:20pm (50 min)', '7:15pm - 8:05pm (50 min)', '7:30pm - 8:20pm (50 min)', '9:15pm - 10:05pm (50 min)'],
-    'Friday': ['6:15am - 7:05am (50 min)', '7:05am - 7:55am (50 min)', '7:15am - 8:05am (50 min)', '8:05am - 8:55am (50 min)', '8:15am - 9:05am (50 min)', '9:05am - 9:55am (50 min)', '1:05pm - 1:55pm (50 min)', '3:15pm - 4:05pm (50 min)', '5:30pm - 6:20pm (50 min)', '8:15pm - 9:05pm (50 min)'],
-    'Saturday': ['6:35am - 7:05am (30 min)', '7:45am - 8:50am (65 min)', '8:15am - 9:05am (50 min)', '10:00am - 10:50am (50 min)', '10:15am - 11:05am (50 min)', '11:00am - 11:50am (50 min)', '11:15am - 12:05pm (50 min)', '12:00pm - 12:50pm (50 min)', '2:15pm - 3:05pm (50 min)', '3:15pm - 4:05pm (50 min)']
-}
-weekday_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday','Sunday']
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    metrics.configure()
+    start = time.perf_counter()
+    records, source = load_history(*argv[:1])
 
+    # Learn recurring slots from history instead of copying a fixed template week
+    model = RecurringSlotModel(weeks=HISTORY_WEEKS).fit(records)
+    year, month = next_month()
+    predicted = model.predict_month(year, month, min_confidence=MIN_CONFIDENCE)
 
+    # Save to public/predicted_next_month_schedule.json
+    output_path = os.path.join('public', 'predicted_next_month_schedule.json')
+    with open(output_path, 'w') as f:
+        json.dump(predicted, f, indent=2)
 
-# Filter the predicted classes
-filtered_predicted = []
-for item in predicted:
-    # Parse the date to get the weekday
-    try:
-        dt = datetime.strptime(item['date'], '%m/%d')
-    except Exception:
-        continue
-    weekday = dt.weekday()  # Monday=0, Sunday=6
-    weekday_name = weekday_names[weekday]
-    if item.get('time') in allowed_times.get(weekday_name, []):
-        filtered_predicted.append(item)
-    else:
-        # Debug: Print out why a class is being filtered out
-        print(f"Filtered out: {weekday_name} {item.get('date')} {item.get('time')}")
-predicted = filtered_predicted
+    elapsed = time.perf_counter() - start
+    print(f"Learned {len(model.slot_weeks)} slots from {len(records)} classes in {source}")
+    print(f"Generated {len(predicted)} predicted classes in {elapsed:.2f}s. Output: {output_path}")
 
-# 3. Save to public/predicted_next_month_schedule.json
-output_path = os.path.join('public', 'predicted_next_month_schedule.json')
-with open(output_path, 'w') as f:
-    json.dump(predicted, f, indent=2)
 
-print(f"Generated {len(predicted)} predicted classes. Output: {output_path}") 
\ No newline at end of file
+if __name__ == "__main__":
+    main()
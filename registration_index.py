@@ -0,0 +1,118 @@
+import re
+from collections import defaultdict
+from datetime import date, timedelta
+
+import metrics
+from Solidcore_scraper import SCHEDULE_URL, WEEKS_AHEAD, fetch_all_schedules, get_this_sunday
+from schedule_parser import parse_records
+from schedule_records import WEEKDAYS, UNKNOWN, parse_clock, parse_date
+from studio_registry import default_registry
+
+
+def normalize_coach(name):
+    """"Megha Doshi" and "Megha D." both become "megha d" """
+    parts = re.sub(r"[^a-z ]", "", (name or "").lower()).split()
+    if not parts:
+        return ""
+    if len(parts) == 1:
+        return parts[0]
+    return f"{parts[0]} {parts[-1][0]}"
+
+
+class RegistrationIndex:
+    """In-memory index from class identity to registration ID
+
+    Built from one parse of the addMoreClassesStaticGrid.php HTML. Keys are
+    (location, month, day, start minute, class family) - the grid's MM/DD
+    dates carry no year, and a few weeks of schedule never repeat one -
+    with a second index by weekday for wishlist entries that name a day of
+    the week rather than a date. Class names on both sides are reduced to
+    the same family key by the StudioRegistry. Coach is checked on the
+    (usually single) candidate list.
+    """
+
+    def __init__(self, records=(), registry=None):
+        self.registry = registry or default_registry()
+        self.by_date = defaultdict(list)
+        self.by_weekday = defaultdict(list)
+        self.add(records)
+
+    def add(self, records):
+        touched = set()
+        for record in records:
+            if not record.registration_id or record.day is None or record.start_min == UNKNOWN:
+                continue
+            family = self.registry.family_key(record.family or record.name)
+            weekday_key = (record.location, record.weekday, record.start_min, family)
+            self.by_date[record.location, record.day.month, record.day.day,
+                         record.start_min, family].append(record)
+            self.by_weekday[weekday_key].append(record)
+            touched.add(weekday_key)
+        for key in touched:
+            self.by_weekday[key].sort(key=lambda r: r.day)
+
+    def __len__(self):
+        return sum(len(candidates) for candidates in self.by_date.values())
+
+    def candidates(self, location, day, time, class_type, coach=None):
+        """All matching classes, earliest first
+
+        `day` is a date, "MM/DD"/"YYYY-MM-DD", or a weekday name such as
+        "Monday"; `time` is "18:00", "6:15pm" or the scraped time range.
+        """
+        start_min = parse_clock(time)
+        family = self.registry.family_key(class_type)
+        if isinstance(day, str) and day.capitalize() in WEEKDAYS:
+            key = (location, WEEKDAYS.index(day.capitalize()), start_min, family)
+            found = self.by_weekday.get(key, [])
+        else:
+            day = day if isinstance(day, date) else parse_date(day)
+            if day is None:
+                return []
+            found = self.by_date.get((location, day.month, day.day, start_min, family), [])
+        if coach:
+            coach = normalize_coach(coach)
+            found = [r for r in found if normalize_coach(r.teacher) == coach]
+        return found
+
+    def lookup(self, location, day, time, class_type, coach=None, after=None, bookable_only=False):
+        """Registration ID of the earliest matching class on/after `after`, or None"""
+        for record in self.candidates(location, day, time, class_type, coach):
+            if after and record.day < after:
+                continue
+            if bookable_only and record.action != "book":
+                continue
+            return record.registration_id
+        return None
+
+    def resolve(self, class_info, after=None, window_start=None):
+        """Registration ID for a ScheduleManager wishlist entry
+
+        An entry with only a weekday takes the first match on/after
+        `window_start` (the start of the newly released schedule), not the
+        first in weeks that were already bookable.
+        """
+        day = class_info.get('date') or class_info['day_of_week']
+        since = after if class_info.get('date') else max(filter(None, (after, window_start)), default=None)
+        registration_id = self.lookup(
+            class_info['location'], day, class_info['time'], class_info['class_type'],
+            class_info.get('coach'), after=since,
+        )
+        metrics.count("registration_lookup", result="hit" if registration_id else "miss")
+        return registration_id
+
+
+@metrics.timed("registration_index_build")
+def build_registration_index(locations, weeks=WEEKS_AHEAD, start=None, registry=None,
+                             session=None, url=SCHEDULE_URL):
+    """Fetch every (location, week) once, concurrently, and index the booking links
+
+    Weeks start from the current one, so dated entries later this week resolve too.
+    """
+    start = start or get_this_sunday().date()
+    dates = [(start + timedelta(weeks=i)).strftime("%Y-%m-%d") for i in range(weeks)]
+    index = RegistrationIndex(registry=registry)
+    for result in fetch_all_schedules(list(locations), dates, session=session, url=url):
+        if result.html:
+            index.add(parse_records(result.html, result.slug))
+    return index
@@ -0,0 +1,187 @@
+import datetime
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import requests
+
+from Solidcore_scraper import (
+    REQUEST_TIMEOUT, SCHEDULE_URL, WEEKS_AHEAD, fetch_all_schedules, get_next_sunday_or_today,
+    get_session, schedule_request,
+)
+from schedule_cache import content_hash
+from schedule_parser import parse_classes
+
+logger = logging.getLogger(__name__)
+
+EMPTY_HASH = content_hash("")
+
+
+@dataclass
+class Frontier:
+    """The first week of a studio's schedule that is not published yet"""
+    slug: str
+    date: str
+    digest: str = EMPTY_HASH
+    etag: str = ""
+    last_modified: str = ""
+
+
+@dataclass
+class Detection:
+    """A week that newly appeared"""
+    slug: str
+    date: str
+    classes: int
+    detected_at: datetime.datetime
+
+
+class ReleaseWatcher:
+    """Polls the schedule endpoint for the first newly published week
+
+    Only each studio's frontier week (the first week without classes) is
+    polled, one small POST per studio. Responses are compared by hash, and
+    conditionally when the server sends an ETag or Last-Modified, so the
+    HTML is only parsed when it actually changed. The poll interval
+    shrinks as the expected release approaches (`approach` times the time
+    left, between `near_interval` and `far_interval`), stays at
+    `near_interval` for `hot_window` seconds past it, then backs off again.
+
+    When a frontier week gains classes, `released` is set, `on_release`
+    is called with the Detection, and the frontier moves on a week.
+    """
+
+    def __init__(self, slugs, release_at=None, on_release=None, session=None, url=SCHEDULE_URL,
+                 far_interval=600.0, near_interval=0.5, hot_window=900.0, approach=0.1,
+                 horizon=WEEKS_AHEAD + 4, stop_on_release=True):
+        self.slugs = sorted(set(slugs))
+        self.release_at = release_at
+        self.on_release = on_release
+        self.session = session or get_session()
+        self.url = url
+        self.far_interval = far_interval
+        self.near_interval = near_interval
+        self.hot_window = hot_window
+        self.approach = approach
+        self.horizon = horizon
+        self.stop_on_release = stop_on_release
+        self.frontiers = {}
+        self.detections = []
+        self.released = threading.Event()
+        self.polls = 0
+        self.parses = 0
+        self._stop = threading.Event()
+        self._finished = threading.Event()  # released, or the watcher exited
+        self._thread = None
+        self._pool = ThreadPoolExecutor(max_workers=max(1, min(len(self.slugs), 8)))
+
+    def discover(self, start=None):
+        """Find every studio's frontier with one concurrent scan of the next `horizon` weeks"""
+        start = start or get_next_sunday_or_today().date()
+        dates = [(start + datetime.timedelta(weeks=i)).strftime("%Y-%m-%d") for i in range(self.horizon)]
+        last_published = {}
+        for result in fetch_all_schedules(self.slugs, dates, session=self.session, url=self.url):
+            # Keep scanning past an empty week (e.g. a closure) to the last published one
+            if result.html and parse_classes(result.html):
+                last_published[result.slug] = result.date
+        for slug in self.slugs:
+            last = last_published.get(slug)
+            frontier = (datetime.date.fromisoformat(last) + datetime.timedelta(weeks=1)) if last else start
+            self.frontiers[slug] = Frontier(slug, frontier.strftime("%Y-%m-%d"))
+        logger.info("Watching " + ", ".join(f"{f.slug} {f.date}" for f in self.frontiers.values()))
+        return self.frontiers
+
+    def interval(self, now=None):
+        """Seconds until the next poll"""
+        if self.release_at is None:
+            return self.far_interval
+        now = now or datetime.datetime.now()
+        remaining = (self.release_at - now).total_seconds()
+        if remaining > 0:
+            # Never sleep through the expected release
+            return max(self.near_interval, min(self.far_interval, remaining * self.approach, remaining))
+        overdue = -remaining
+        if overdue < self.hot_window:
+            return self.near_interval
+        return min(self.far_interval, self.near_interval + (overdue - self.hot_window) * self.approach)
+
+    def probe(self, frontier):
+        """Poll one frontier week; returns a Detection if it gained classes"""
+        headers, payload = schedule_request(frontier.slug, frontier.date)
+        if frontier.etag:
+            headers["If-None-Match"] = frontier.etag
+        if frontier.last_modified:
+            headers["If-Modified-Since"] = frontier.last_modified
+        response = self.session.post(self.url, headers=headers, data=payload, timeout=REQUEST_TIMEOUT)
+        self.polls += 1
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        frontier.etag = response.headers.get("ETag", "")
+        frontier.last_modified = response.headers.get("Last-Modified", "")
+        html = response.json().get("finalData", "")
+        digest = content_hash(html)
+        if digest == frontier.digest:
+            return None
+        frontier.digest = digest
+        self.parses += 1
+        classes = len(parse_classes(html)) if html else 0
+        if not classes:
+            return None
+        return Detection(frontier.slug, frontier.date, classes, datetime.datetime.now())
+
+    def poll_once(self):
+        """Probe every frontier concurrently; returns the new Detections"""
+        def safe_probe(frontier):
+            try:
+                return self.probe(frontier)
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"Probe of {frontier.slug} {frontier.date} failed: {str(e)}")
+                return None
+
+        found = [d for d in self._pool.map(safe_probe, list(self.frontiers.values())) if d]
+        for detection in found:
+            logger.info(f"New week published: {detection.slug} {detection.date} "
+                        f"({detection.classes} classes)")
+            next_week = datetime.date.fromisoformat(detection.date) + datetime.timedelta(weeks=1)
+            self.frontiers[detection.slug] = Frontier(detection.slug, next_week.strftime("%Y-%m-%d"))
+            self.detections.append(detection)
+        if found:
+            self.released.set()
+            self._finished.set()
+            if self.on_release:
+                for detection in found:
+                    self.on_release(detection)
+        return found
+
+    def run(self):
+        """Poll until a release is detected (or forever if stop_on_release is False)"""
+        try:
+            if not self.frontiers:
+                self.discover()
+            while not self._stop.is_set():
+                start = time.monotonic()
+                if self.poll_once() and self.stop_on_release:
+                    break
+                self._stop.wait(max(0.0, self.interval() - (time.monotonic() - start)))
+        finally:
+            self._finished.set()
+
+    def start(self):
+        """Run the watcher on a background thread"""
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Block until a release is detected or the watcher stops; returns the first Detection"""
+        self._finished.wait(timeout)
+        return self.detections[0] if self.detections else None
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._pool.shutdown()
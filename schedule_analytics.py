@@ -0,0 +1,172 @@
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from schedule_store import ScheduleStore
+
+HISTORY_SQL = """
+SELECT c.location, c.day, c.weekday, c.start_min, c.studio_room, c.teacher,
+       c.open_spots, c.total_spots, s.scraped_at
+FROM class_snapshots c JOIN scrapes s ON s.id = c.scrape_id
+WHERE c.total_spots > 0
+"""
+
+
+class ScheduleHistory:
+    """Every scraped snapshot as parallel NumPy columns.
+
+    Strings (location, teacher) are stored as integer codes into the
+    `locations` / `teachers` lookup arrays, so grouping never touches
+    Python objects.
+    """
+
+    def __init__(self, location, day, weekday, start_min, studio_room, teacher,
+                 open_spots, total_spots, scraped_at):
+        self.locations, self.location = np.unique(np.asarray(location, dtype=str), return_inverse=True)
+        self.teachers, self.teacher = np.unique(np.asarray(teacher, dtype=str), return_inverse=True)
+        self.day = np.asarray(day, dtype="datetime64[D]").astype(np.int64)
+        self.weekday = np.asarray(weekday, dtype=np.int64)
+        self.start_min = np.asarray(start_min, dtype=np.int64)
+        self.studio_room = np.asarray(studio_room, dtype=np.int64)
+        self.open_spots = np.asarray(open_spots, dtype=np.float64)
+        self.total_spots = np.asarray(total_spots, dtype=np.float64)
+        self.scraped_at = np.asarray(scraped_at, dtype="datetime64[s]").astype(np.int64)
+
+    def __len__(self):
+        return len(self.day)
+
+    @classmethod
+    def from_store(cls, store):
+        rows = store.conn.execute(HISTORY_SQL).fetchall()
+        columns = list(zip(*rows)) if rows else [()] * 9
+        return cls(*columns)
+
+    @classmethod
+    def from_records(cls, records, scraped_at=None):
+        """Build a one-snapshot history from ClassRecords (e.g. a single scrape)"""
+        scraped_at = np.datetime64(scraped_at or datetime.now(), "s")
+        records = [r for r in records if r.day is not None and r.total_spots > 0]
+        return cls(
+            [r.location for r in records], [r.day for r in records],
+            [r.weekday for r in records], [r.start_min for r in records],
+            [r.studio_room for r in records], [r.teacher for r in records],
+            [r.open_spots for r in records], [r.total_spots for r in records],
+            [scraped_at] * len(records),
+        )
+
+
+def _group(*keys):
+    """Dense group ids for rows sharing the same integer key columns.
+
+    The columns are packed into one int64 per row (mixed radix over each
+    column's range) so grouping is a single 1-D sort.
+    """
+    n = len(keys[0])
+    if not n:
+        return np.empty((0, len(keys)), dtype=np.int64), np.empty(0, dtype=np.int64)
+    combined = np.zeros(n, dtype=np.int64)
+    for key in keys:
+        key = np.asarray(key, dtype=np.int64)
+        low = key.min()
+        combined = combined * (int(key.max() - low) + 1) + (key - low)
+    _, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+    return np.column_stack([np.asarray(k)[first] for k in keys]), inverse.reshape(-1)
+
+
+def slot_stats(history):
+    """Fill rate, sell-out rate and time-to-sellout per slot.
+
+    A slot is (location, weekday, start time, teacher, studio room). Each
+    class contributes its latest snapshot to the fill rate, and the hours
+    between first being seen and first being full to the sell-out time.
+    `sellout_trend` is the least-squares slope of hours-to-sellout per
+    week of class date; negative means the slot sells out faster lately.
+    """
+    h = history
+    # One id per physical class, one per slot
+    class_keys, class_id = _group(h.location, h.day, h.start_min, h.studio_room)
+    n_classes = len(class_keys)
+
+    order = np.lexsort((h.scraped_at, class_id))
+    last = order[np.r_[class_id[order][1:] != class_id[order][:-1], True]] if len(order) else order
+    first_seen = np.full(n_classes, np.iinfo(np.int64).max)
+    np.minimum.at(first_seen, class_id, h.scraped_at)
+    first_full = np.full(n_classes, np.iinfo(np.int64).max)
+    full = h.open_spots == 0
+    np.minimum.at(first_full, class_id[full], h.scraped_at[full])
+    sold_out = first_full != np.iinfo(np.int64).max
+
+    # Latest state per class, in class_id order
+    latest = np.empty(n_classes, dtype=np.int64)
+    latest[class_id[last]] = last
+    fill = 1.0 - h.open_spots[latest] / h.total_spots[latest]
+    hours = np.where(sold_out, (first_full - first_seen) / 3600.0, 0.0)
+    weeks = h.day[latest] / 7.0
+
+    slots, slot_id = _group(h.location[latest], h.weekday[latest], h.start_min[latest],
+                            h.teacher[latest], h.studio_room[latest])
+    n_slots = len(slots)
+    count = np.bincount(slot_id, minlength=n_slots).astype(np.float64)
+    sold = np.bincount(slot_id, weights=sold_out, minlength=n_slots)
+    fill_rate = np.bincount(slot_id, weights=fill, minlength=n_slots) / np.maximum(count, 1)
+    sellout_rate = sold / np.maximum(count, 1)
+
+    # Time-to-sellout stats over sold-out classes only
+    w = sold_out.astype(np.float64)
+    sum_y = np.bincount(slot_id, weights=hours * w, minlength=n_slots)
+    sum_x = np.bincount(slot_id, weights=weeks * w, minlength=n_slots)
+    sum_xy = np.bincount(slot_id, weights=weeks * hours * w, minlength=n_slots)
+    sum_xx = np.bincount(slot_id, weights=weeks * weeks * w, minlength=n_slots)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_hours = np.where(sold > 0, sum_y / sold, np.nan)
+        denom = sold * sum_xx - sum_x * sum_x
+        trend = np.where((sold > 1) & (denom > 0), (sold * sum_xy - sum_x * sum_y) / denom, np.nan)
+
+    return {
+        "location": h.locations[slots[:, 0]] if n_slots else np.empty(0, dtype=str),
+        "weekday": slots[:, 1],
+        "start_min": slots[:, 2],
+        "teacher": h.teachers[slots[:, 3]] if n_slots else np.empty(0, dtype=str),
+        "studio_room": slots[:, 4],
+        "classes": count.astype(np.int64),
+        "fill_rate": fill_rate,
+        "sellout_rate": sellout_rate,
+        "hours_to_sellout": mean_hours,
+        "sellout_trend": trend,
+    }
+
+
+def hardest_slots(stats, top=20):
+    """Indices of the hardest slots to book, hardest first.
+
+    Ranked by sell-out rate, then faster time-to-sellout, then fill rate.
+    """
+    hours = np.nan_to_num(stats["hours_to_sellout"], nan=np.inf)
+    order = np.lexsort((-stats["fill_rate"], hours, -stats["sellout_rate"]))
+    return order[:top]
+
+
+def format_minutes(minutes):
+    hour, minute = divmod(int(minutes), 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d}{'am' if hour < 12 else 'pm'}"
+
+
+if __name__ == "__main__":
+    weekday_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "schedule.db"
+    with ScheduleStore(db_path) as store:
+        history = ScheduleHistory.from_store(store)
+    if not len(history):
+        print(f"🛑 No scrape history in {db_path}")
+        sys.exit(1)
+
+    stats = slot_stats(history)
+    print(f"📊 {len(history)} snapshots, {len(stats['classes'])} slots")
+    for i in hardest_slots(stats):
+        hours = stats["hours_to_sellout"][i]
+        sellout = f"{hours:.1f}h to sell out" if not np.isnan(hours) else "never sold out"
+        print(f"🔥 {stats['location'][i]} {weekday_names[stats['weekday'][i]]} "
+              f"{format_minutes(stats['start_min'][i])} {stats['teacher'][i]} "
+              f"(Studio {stats['studio_room'][i]}): "
+              f"{stats['sellout_rate'][i]:.0%} sold out, {stats['fill_rate'][i]:.0%} full, {sellout}")
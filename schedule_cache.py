@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from metrics import timed
+
+
+def content_hash(html):
+    """Stable digest of a week's finalData HTML"""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+class ScheduleCache:
+    """On-disk cache of parsed weeks keyed by (slug, dateChange).
+
+    Each entry keeps the hash of the finalData it was parsed from, so a
+    week whose HTML has not changed can reuse its records without being
+    parsed or written to disk again.
+    """
+
+    def __init__(self, path="schedule_cache.json"):
+        self.path = path
+        self.dirty = False
+        self.load()
+
+    @staticmethod
+    def key(slug, date):
+        return f"{slug}|{date}"
+
+    def load(self):
+        """Load cached weeks from disk, starting empty if missing or corrupt"""
+        self.entries = {}
+        self.last_run = []
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self.entries = data["weeks"]
+                self.last_run = data["last_run"]
+            except (OSError, ValueError, KeyError, TypeError):
+                self.entries, self.last_run = {}, []
+
+    @timed("cache_save")
+    def save(self):
+        """Atomically write the cache if anything changed"""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"weeks": self.entries, "last_run": self.last_run}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.dirty = False
+
+    def get(self, slug, date, digest):
+        """Return cached records if the week's hash matches, else None"""
+        entry = self.entries.get(self.key(slug, date))
+        if entry and entry["hash"] == digest:
+            return entry["records"]
+        return None
+
+    def put(self, slug, date, digest, records):
+        self.entries[self.key(slug, date)] = {
+            "hash": digest,
+            "records": records,
+            "updated_at": datetime.now().isoformat(),
+        }
+        self.dirty = True
+
+    def record_run(self, weeks):
+        """Remember which weeks this run produced; True if that set changed"""
+        weeks = [self.key(slug, date) for slug, date in weeks]
+        if weeks == self.last_run:
+            return False
+        self.last_run = weeks
+        self.dirty = True
+        return True
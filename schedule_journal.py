@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def new_class_id():
+    return uuid.uuid4().hex[:12]
+
+
+class ScheduleJournal:
+    """Crash-safe, append-only log of scheduled-class changes
+
+    State lives in a snapshot (`scheduled_classes.json`, the same list the
+    manager always wrote) plus a journal of one JSON event per line:
+
+        {"op": "add", "id": ..., "class": {...}}
+        {"op": "update", "id": ..., "fields": {...}}
+        {"op": "remove", "id": ...}
+
+    Recording an event is one small append, so it costs the same with ten
+    entries or ten thousand. Appends are fsynced in batches at most every
+    `fsync_interval` seconds (or on sync()), and after `compact_every`
+    events the state is written to a fresh snapshot and the journal is
+    truncated. A torn last line from a crash is cut off on replay, and
+    replaying is idempotent, so a crash mid-compaction loses nothing.
+    """
+
+    def __init__(self, snapshot_path="scheduled_classes.json", journal_path=None,
+                 fsync_interval=0.2, compact_every=1000):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or f"{os.path.splitext(snapshot_path)[0]}.journal"
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.classes = {}
+        self.events = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = False
+        self._last_sync = 0.0
+
+    def load(self):
+        """Rebuild state from snapshot + journal; returns the class list"""
+        self.classes = {}
+        assigned_ids = False
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                for class_info in json.load(f):
+                    if 'id' not in class_info:
+                        class_info['id'] = new_class_id()
+                        assigned_ids = True
+                    self.classes[class_info['id']] = class_info
+
+        self.events = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb') as f:
+                lines = f.readlines()
+            for i, line in enumerate(lines):
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    if i == len(lines) - 1:
+                        # A crash mid-append leaves a torn last line; cut it off
+                        logger.warning("Dropping torn journal entry")
+                        os.truncate(self.journal_path, sum(len(l) for l in lines[:-1]))
+                    else:
+                        logger.warning(f"Skipping unreadable journal entry {i + 1}")
+                    continue
+                self._apply(event)
+                self.events += 1
+        self._file = open(self.journal_path, 'a')
+        if assigned_ids:
+            # Journaled changes refer to these ids, so they have to outlive a restart
+            self.compact(force=True)
+        return list(self.classes.values())
+
+    def _apply(self, event):
+        op = event.get('op')
+        if op == 'add':
+            self.classes[event['id']] = event['class']
+        elif op == 'update' and event['id'] in self.classes:
+            self.classes[event['id']].update(event['fields'])
+        elif op == 'remove':
+            self.classes.pop(event['id'], None)
+
+    def _write(self, event):
+        # Caller holds the lock
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+        self.events += 1
+        metrics.count("journal_events", op=event['op'])
+        self._unsynced = True
+        now = time.monotonic()
+        if now - self._last_sync >= self.fsync_interval:
+            self._fsync(now)
+
+    def _fsync(self, now=None):
+        with metrics.timer("journal_fsync"):
+            os.fsync(self._file.fileno())
+        self._unsynced = False
+        self._last_sync = now or time.monotonic()
+
+    def _maybe_compact(self):
+        if self.events >= self.compact_every:
+            self.compact()
+
+    def add(self, class_info):
+        with self._lock:
+            class_info.setdefault('id', new_class_id())
+            self.classes[class_info['id']] = class_info
+            self._write({'op': 'add', 'id': class_info['id'], 'class': class_info})
+        self._maybe_compact()
+
+    def update(self, class_info, **fields):
+        with self._lock:
+            class_info.update(fields)
+            self._write({'op': 'update', 'id': class_info['id'], 'fields': fields})
+        self._maybe_compact()
+
+    def remove(self, class_info):
+        with self._lock:
+            self.classes.pop(class_info['id'], None)
+            self._write({'op': 'remove', 'id': class_info['id']})
+        self._maybe_compact()
+
+    def sync(self):
+        """Force any batched appends to disk"""
+        with self._lock:
+            if self._unsynced:
+                self._fsync()
+
+    @metrics.timed("journal_compact")
+    def compact(self, force=False):
+        """Write the current state as a new snapshot and start an empty journal"""
+        with self._lock:
+            if not self.events and not force:
+                return
+            directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(list(self.classes.values()), f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.snapshot_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            # Only now is it safe to drop the journal; replaying it over the
+            # new snapshot would be harmless anyway
+            self._file.close()
+            self._file = open(self.journal_path, 'w')
+            os.fsync(self._file.fileno())
+            self.events = 0
+            self._unsynced = False
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -1,18 +1,25 @@
 import json
 import datetime
-import time
 import logging
 from pathlib import Path
 import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import pickle
 import os
 import tempfile
 import calendar
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+from Solidcore_scraper import WEEKS_AHEAD, fetch_all_schedules, get_this_sunday
+from booking_executor import BookingExecutor, summarize
+from booking_sniper import ReleaseSniper
+from registration_index import build_registration_index
+from release_watcher import ReleaseWatcher
+from schedule_journal import ScheduleJournal
+from schedule_parser import parse_records
+from schedule_records import parse_date
+from session_manager import COOKIES_FILE, SessionManager, browser_refresher
+from studio_registry import default_registry
 
 # Configure logging
 logging.basicConfig(
@@ -21,46 +28,88 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+BOOKING_URL = "https://solidcore.co/assets/ajax/postBook.php"
+# Schedules go live at 1am on the 24th for members
+RELEASE_DAY = 24
+RELEASE_HOUR = 1
+
+# Either the booking widget items or the static schedule grid
+SCHEDULE_READY_SELECTOR = '.class-schedule-item, .schedule-day'
+SCHEDULE_READY_TIMEOUT = 15
+
 class ScheduleManager:
-    def __init__(self):
-        self.schedule_file = "scheduled_classes.json"
+    def __init__(self, schedule_file="scheduled_classes.json", cookies_file=COOKIES_FILE, connections=16):
+        self.schedule_file = schedule_file
         self.pattern_file = "schedule_patterns.json"
-        self.locations = {
-            "chelsea": {
-                "name": "NY, Chelsea",
-                "url": "https://solidcore.co/book/new-york/chelsea"
-            },
-            "downtown-brooklyn": {
-                "name": "NY, Downtown Brooklyn",
-                "url": "https://solidcore.co/book/new-york/downtown-brooklyn"
-            }
-            # Add more locations as needed
-        }
-        self.class_types = {
-            "power50": "Power50",
-            "power30": "Power30: Core + Upper Body",
-            "starter50": "Starter50: Intro To [solidcore]",
-            "foundation50": "Foundation50: Build Your Basics"
-            # Add more class types as needed
-        }
+        self.registry = default_registry()
+        self.locations = self.registry.studios
+        self.class_types = self.registry.class_types
+        self.booking_url = BOOKING_URL
+        self.sessions = SessionManager(cookies_file, pool_size=connections, refresher=self.refresh_cookies)
+        self.cookies_file = self.sessions.cookies_file
+        self.driver_pool = None
         self.load_scheduled_classes()
         self.load_schedule_patterns()
 
+    def get_driver_pool(self):
+        """Shared pool of warm, authenticated browsers, started on first use"""
+        if self.driver_pool is None:
+            from driver_pool import DriverPool  # Selenium is only loaded when a browser is needed
+
+            self.driver_pool = DriverPool(size=2, cookies_file=self.cookies_file)
+        return self.driver_pool
+
+    def refresh_cookies(self):
+        """Fresh login cookies from a pooled browser, for SessionManager.refresh"""
+        return browser_refresher(self.get_driver_pool())()
+
+    def close(self):
+        """Shut down any pooled browsers and the shared session, and flush the wishlist journal"""
+        if self.driver_pool is not None:
+            self.driver_pool.close()
+            self.driver_pool = None
+        self.sessions.close()
+        self.journal.close()
+
+    def load_location_page(self, driver, location):
+        """Open a location's schedule page and wait until classes are rendered"""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver.get(self.locations[location]['url'])
+        try:
+            WebDriverWait(driver, SCHEDULE_READY_TIMEOUT).until(
+                lambda d: d.find_elements(By.CSS_SELECTOR, SCHEDULE_READY_SELECTOR)
+            )
+        except TimeoutException:
+            logger.warning(f"Schedule for {location} did not load within {SCHEDULE_READY_TIMEOUT}s")
+
     def load_scheduled_classes(self):
-        """Load scheduled classes from JSON file"""
-        if os.path.exists(self.schedule_file):
-            with open(self.schedule_file, 'r') as f:
-                self.scheduled_classes = json.load(f)
-        else:
-            self.scheduled_classes = []
+        """Load scheduled classes from the JSON snapshot plus the change journal"""
+        self.journal = ScheduleJournal(self.schedule_file)
+        self.scheduled_classes = self.journal.load()
 
     def save_scheduled_classes(self):
-        """Save scheduled classes to JSON file"""
-        with open(self.schedule_file, 'w') as f:
-            json.dump(self.scheduled_classes, f, indent=2)
+        """Compact the journal into a fresh scheduled_classes.json snapshot"""
+        self.journal.compact()
+
+    def update_scheduled_class(self, class_info, **fields):
+        """Change fields of a scheduled class, journaling the change"""
+        self.journal.update(class_info, **fields)
+
+    def sync_scheduled_classes(self):
+        """Make sure every journaled change is on disk"""
+        self.journal.sync()
+
+    def add_class_to_schedule(self, location, class_type, day_of_week, time, coach=None,
+                              date=None, registration_id=None):
+        """Add a class to the schedule
 
-    def add_class_to_schedule(self, location, class_type, day_of_week, time, coach=None):
-        """Add a class to the schedule"""
+        `time` may be "18:00", "6:15pm" or a scraped range such as
+        "6:15pm - 7:05pm (50 min)". With a `date` (e.g. from slot_search)
+        only that one class is booked rather than the next on that weekday.
+        """
         class_info = {
             "location": location,
             "class_type": class_type,
@@ -68,111 +117,169 @@ class ScheduleManager:
             "time": time,
             "coach": coach,
             "status": "scheduled",
-            "registration_id": None,
+            "registration_id": registration_id,
             "last_checked": None
         }
+        if date:
+            class_info["date"] = date
+        self.journal.add(class_info)
         self.scheduled_classes.append(class_info)
-        self.save_scheduled_classes()
         logger.info(f"Added class to schedule: {class_info}")
 
     def remove_class_from_schedule(self, index):
         """Remove a class from the schedule"""
         if 0 <= index < len(self.scheduled_classes):
             removed = self.scheduled_classes.pop(index)
-            self.save_scheduled_classes()
+            self.journal.remove(removed)
             logger.info(f"Removed class from schedule: {removed}")
             return True
         return False
 
-    def get_schedule_release_date(self):
-        """Get the next schedule release date (24th of current/next month)"""
-        today = datetime.datetime.now()
-        if today.day >= 24:
-            # If we're past the 24th, schedule releases next month
-            release_date = today.replace(day=24) + datetime.timedelta(days=32)
-            release_date = release_date.replace(day=24)
-        else:
-            # Schedule releases this month
-            release_date = today.replace(day=24)
+    def _release_in_month(self, year, month):
+        return datetime.datetime(year, month, RELEASE_DAY, RELEASE_HOUR)
+
+    def get_schedule_release_date(self, now=None):
+        """Get the next schedule release date (24th of current/next month, 1am)"""
+        now = now or datetime.datetime.now()
+        release_date = self._release_in_month(now.year, now.month)
+        if now >= release_date:
+            # If we're past this month's release, schedule releases next month
+            year, month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+            release_date = self._release_in_month(year, month)
         return release_date
 
-    def check_schedule_released(self):
-        """Check if the schedule has been released"""
-        release_date = self.get_schedule_release_date()
-        return datetime.datetime.now() >= release_date
+    def release_window_start(self, release_at=None, now=None):
+        """First day of the schedule a release publishes (the month after it)
+
+        Without `release_at`, the latest release at or before `now` is used.
+        """
+        if release_at is None:
+            now = now or datetime.datetime.now()
+            release_at = self._release_in_month(now.year, now.month)
+            if now < release_at:
+                year, month = (now.year - 1, 12) if now.month == 1 else (now.year, now.month - 1)
+                release_at = self._release_in_month(year, month)
+        return (release_at.replace(day=1) + datetime.timedelta(days=32)).replace(day=1).date()
+
+    def published_through(self, now=None):
+        """Last day of the schedule that is already published"""
+        start = self.release_window_start(now=now)
+        return start.replace(day=calendar.monthrange(start.year, start.month)[1])
+
+    def awaits_release(self, class_info, now=None):
+        """Can only the next release make this class bookable?
+
+        True for weekday-only entries before this month's release, and for
+        dated entries past the published schedule.
+        """
+        day = parse_date(class_info.get('date'))
+        if day is None:
+            return not self.check_schedule_released(now)
+        return day > self.published_through(now)
 
+    def check_schedule_released(self, now=None):
+        """Check if this month's schedule has been released"""
+        now = now or datetime.datetime.now()
+        return now >= self._release_in_month(now.year, now.month)
+
+    @metrics.timed("registration_browser_lookup")
     def find_class_registration_id(self, class_info):
         """Find the registration ID for a scheduled class"""
-        try:
-            # Initialize Chrome
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')  # Run in headless mode
-            driver = webdriver.Chrome(options=chrome_options)
+        from selenium.webdriver.common.by import By
+
+        with self.get_driver_pool().driver() as driver:
+            self.load_location_page(driver, class_info['location'])
             
-            # Load cookies
-            if os.path.exists("solidcore_cookies.pkl"):
-                driver.get("https://solidcore.co")
-                with open("solidcore_cookies.pkl", "rb") as f:
-                    cookies = pickle.load(f)
-                    for cookie in cookies:
-                        driver.add_cookie(cookie)
-                
-                # Navigate to location page
-                location_url = self.locations[class_info['location']]['url']
-                driver.get(location_url)
-                
-                # Wait for schedule to load
-                time.sleep(5)
-                
-                # Look for class matching criteria
-                # This is a simplified version - you'll need to implement the actual class matching logic
-                class_elements = driver.find_elements(By.CSS_SELECTOR, '.class-schedule-item')
-                for element in class_elements:
-                    if (class_info['class_type'] in element.text and
-                        class_info['day_of_week'] in element.text and
-                        class_info['time'] in element.text):
-                        # Extract registration ID from the element
-                        registration_id = element.get_attribute('data-registration-id')
-                        if registration_id:
-                            return registration_id
-                
-            return None
-        finally:
-            driver.quit()
+            # Look for class matching criteria
+            # This is a simplified version - you'll need to implement the actual class matching logic
+            class_elements = driver.find_elements(By.CSS_SELECTOR, '.class-schedule-item')
+            for element in class_elements:
+                if (self.registry.matches(class_info['class_type'], element.text) and
+                    class_info['day_of_week'] in element.text and
+                    class_info['time'] in element.text):
+                    # Extract registration ID from the element
+                    registration_id = element.get_attribute('data-registration-id')
+                    if registration_id:
+                        return registration_id
+            
+        return None
+
+    def resolve_registration_ids(self, classes=None):
+        """Fill in registration IDs for scheduled classes from one AJAX fetch
+
+        Every location on the wishlist is fetched once and indexed, so each
+        class is a dictionary lookup. Selenium is only used for classes
+        the index cannot match. Returns the number of IDs found.
+        """
+        pending = [
+            c for c in (self.scheduled_classes if classes is None else classes)
+            if c['status'] == 'scheduled' and not c['registration_id']
+        ]
+        if not pending:
+            return 0
+
+        try:
+            index = build_registration_index(
+                {c['location'] for c in pending}, registry=self.registry)
+        except Exception as e:
+            logger.warning(f"Could not build registration index: {str(e)}")
+            index = None
+
+        found = 0
+        today = datetime.date.today()
+        window_start = self.release_window_start()
+        for class_info in pending:
+            registration_id = index.resolve(class_info, after=today, window_start=window_start) if index else None
+            if not registration_id:
+                logger.info(f"No AJAX match for {class_info}, falling back to browser lookup")
+                registration_id = self.find_class_registration_id(class_info)
+            if registration_id:
+                self.update_scheduled_class(class_info, registration_id=registration_id,
+                                            last_checked=datetime.datetime.now().isoformat())
+                found += 1
+        if found:
+            self.sync_scheduled_classes()
+        return found
 
     def book_scheduled_classes(self):
-        """Book all scheduled classes that have been found"""
-        if not self.check_schedule_released():
-            logger.info("Schedule not yet released")
+        """Book every scheduled class whose week is already published"""
+        pending = [c for c in self.scheduled_classes
+                   if c['status'] == 'scheduled' and not self.awaits_release(c)]
+        if not pending:
+            logger.info("Nothing on the published schedule to book")
             return
 
-        for class_info in self.scheduled_classes:
-            if class_info['status'] == 'scheduled':
-                # Find registration ID if not already found
-                if not class_info['registration_id']:
-                    registration_id = self.find_class_registration_id(class_info)
-                    if registration_id:
-                        class_info['registration_id'] = registration_id
-                        class_info['last_checked'] = datetime.datetime.now().isoformat()
-                        self.save_scheduled_classes()
-                
-                # Book the class if we have a registration ID
-                if class_info['registration_id']:
-                    if self.book_class(class_info):
-                        class_info['status'] = 'booked'
-                        self.save_scheduled_classes()
-                        logger.info(f"Successfully booked class: {class_info}")
-
-    def book_class(self, class_info):
-        """Book a class using the registration ID"""
+        self.resolve_registration_ids(pending)
+        summarize(BookingExecutor(self).run(pending))
+
+    def book_class(self, class_info, session=None):
+        """Book a class using the registration ID
+
+        Without a `session` the manager's shared, authenticated session
+        (and its warm connections) is used.
+        """
+        outcome, _ = self.try_book_class(class_info, session)
+        return outcome == "booked"
+
+    def try_book_class(self, class_info, session=None):
+        """Attempt a booking and say why it failed
+
+        Returns (outcome, message), where outcome is "booked"; "transient"
+        for connection errors, timeouts and 5xx/429 responses, which are
+        worth retrying; "refused" when the site answered the booking with
+        something other than success (e.g. the class is full); or "error"
+        for anything else, such as a rejected login.
+        """
+        outcome, message = self._post_booking(class_info, session)
+        metrics.count("booking", outcome=outcome)
+        return outcome, message
+
+    def _post_booking(self, class_info, session=None):
         try:
-            # Load cookies
-            with open("solidcore_cookies.pkl", "rb") as f:
-                cookies = pickle.load(f)
-            cookie_dict = {cookie['name']: cookie['value'] for cookie in cookies}
-            
+            session = session or self.sessions.session()
+
             # Prepare booking request
-            url = "https://solidcore.co/assets/ajax/postBook.php"
+            url = self.booking_url
             headers = {
                 'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
                 'X-Requested-With': 'XMLHttpRequest',
@@ -189,81 +296,112 @@ class ScheduleManager:
             }
             
             # Make booking request
-            response = requests.post(url, headers=headers, cookies=cookie_dict, data=data)
+            with metrics.timer("booking_request"):
+                response = session.post(url, headers=headers, data=data, timeout=15)
+            self.sessions.note_response(response)
+            if response.status_code == 429 or response.status_code >= 500:
+                return "transient", f"HTTP {response.status_code}"
             response.raise_for_status()
             
-            return '"Status":"Success"' in response.text
+            if '"Status":"Success"' in response.text:
+                return "booked", "booked"
+            if '"Status"' in response.text:
+                return "refused", response.text[:200]
+            # Not a booking answer at all, e.g. a login page
+            return "error", response.text[:200]
             
+        except (requests.ConnectionError, requests.Timeout) as e:
+            logger.error(f"Error booking class: {str(e)}")
+            return "transient", str(e)
         except Exception as e:
             logger.error(f"Error booking class: {str(e)}")
-            return False
+            return "error", str(e)
 
     def load_schedule_patterns(self):
         """Load schedule patterns from JSON file"""
+        self.schedule_patterns = {}
+        self.pattern_hashes = {}
         if os.path.exists(self.pattern_file):
             with open(self.pattern_file, 'r') as f:
-                self.schedule_patterns = json.load(f)
-        else:
-            self.schedule_patterns = {}
+                data = json.load(f)
+            if set(data) == {"patterns", "hashes"}:
+                self.schedule_patterns = data["patterns"]
+                self.pattern_hashes = data["hashes"]
+            else:
+                # Older files hold the patterns dict on its own
+                self.schedule_patterns = data
 
     def save_schedule_patterns(self):
         """Save schedule patterns to JSON file"""
         with open(self.pattern_file, 'w') as f:
-            json.dump(self.schedule_patterns, f, indent=2)
+            json.dump({"patterns": self.schedule_patterns, "hashes": self.pattern_hashes}, f, indent=2)
 
     def fetch_current_schedule(self, location):
         """Fetch the current month's schedule to establish patterns"""
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            driver = webdriver.Chrome(options=chrome_options)
+        from selenium.webdriver.common.by import By
+
+        with self.get_driver_pool().driver() as driver:
+            self.load_location_page(driver, location)
             
-            if os.path.exists("solidcore_cookies.pkl"):
-                driver.get("https://solidcore.co")
-                with open("solidcore_cookies.pkl", "rb") as f:
-                    cookies = pickle.load(f)
-                    for cookie in cookies:
-                        driver.add_cookie(cookie)
-                
-                # Navigate to location page
-                location_url = self.locations[location]['url']
-                driver.get(location_url)
-                
-                # Wait for schedule to load
-                time.sleep(5)
-                
-                # Extract schedule information
-                schedule_data = []
-                class_elements = driver.find_elements(By.CSS_SELECTOR, '.class-schedule-item')
-                
-                for element in class_elements:
-                    try:
-                        class_info = {
-                            'day_of_week': element.find_element(By.CSS_SELECTOR, '.day-name').text,
-                            'time': element.find_element(By.CSS_SELECTOR, '.class-time').text,
-                            'class_type': element.find_element(By.CSS_SELECTOR, '.class-name').text,
-                            'coach': element.find_element(By.CSS_SELECTOR, '.coach-name').text,
-                            'date': element.find_element(By.CSS_SELECTOR, '.date').text
-                        }
-                        schedule_data.append(class_info)
-                    except Exception as e:
-                        logger.warning(f"Could not extract class info: {str(e)}")
-                
-                return schedule_data
-                
-        finally:
-            driver.quit()
-        return []
+            # Extract schedule information
+            schedule_data = []
+            class_elements = driver.find_elements(By.CSS_SELECTOR, '.class-schedule-item')
+            
+            for element in class_elements:
+                try:
+                    class_info = {
+                        'day_of_week': element.find_element(By.CSS_SELECTOR, '.day-name').text,
+                        'time': element.find_element(By.CSS_SELECTOR, '.class-time').text,
+                        'class_type': element.find_element(By.CSS_SELECTOR, '.class-name').text,
+                        'coach': element.find_element(By.CSS_SELECTOR, '.coach-name').text,
+                        'date': element.find_element(By.CSS_SELECTOR, '.date').text
+                    }
+                    schedule_data.append(class_info)
+                except Exception as e:
+                    logger.warning(f"Could not extract class info: {str(e)}")
+            
+            if not class_elements:
+                # Static schedule grid: parse the rendered page in one go
+                for record in parse_records(driver.page_source, location):
+                    schedule_data.append({
+                        'day_of_week': record.weekday_name,
+                        'time': record.time,
+                        'class_type': record.name,
+                        'coach': record.teacher,
+                        'date': record.date
+                    })
+            
+            return schedule_data
+
+    @staticmethod
+    def _time_slot_key(time_slot):
+        return (time_slot['time'], time_slot['class_type'], time_slot['coach'])
+
+    @staticmethod
+    def schedule_hash(schedule_data):
+        """Stable digest of fetched schedule data, to spot unchanged fetches"""
+        encoded = json.dumps(schedule_data, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
 
-    def analyze_schedule_pattern(self, schedule_data):
-        """Analyze schedule data to identify patterns"""
-        patterns = {}
+    def analyze_schedule_pattern(self, schedule_data, patterns=None, index=None):
+        """Analyze schedule data to identify patterns
+
+        New time slots are merged into `patterns` (a fresh dict by default);
+        `index` holds a set of slot keys per day so each check is O(1).
+        """
+        patterns = {} if patterns is None else patterns
+        if index is None:
+            index = {
+                day: {self._time_slot_key(slot) for slot in slots}
+                for day, slots in patterns.items()
+            }
         
         # Group classes by day of week
         for class_info in schedule_data:
             day = class_info['day_of_week']
             if day not in patterns:
                 patterns[day] = []
+                index[day] = set()
             
             # Check if this time slot already exists
             time_slot = {
@@ -271,25 +409,33 @@ class ScheduleManager:
                 'class_type': class_info['class_type'],
                 'coach': class_info['coach']
             }
+            key = self._time_slot_key(time_slot)
             
-            if time_slot not in patterns[day]:
+            if key not in index[day]:
+                index[day].add(key)
                 patterns[day].append(time_slot)
         
         return patterns
 
-    def predict_next_month_schedule(self, location):
-        """Predict next month's schedule based on current patterns"""
-        # Fetch current schedule
-        current_schedule = self.fetch_current_schedule(location)
-        
-        # Analyze patterns
-        patterns = self.analyze_schedule_pattern(current_schedule)
-        
-        # Save patterns
-        self.schedule_patterns[location] = patterns
-        self.save_schedule_patterns()
-        
-        # Generate next month's schedule
+    def update_schedule_patterns(self, location, schedule_data, schedule_hash=None):
+        """Rebuild the cached patterns for a location from newly fetched classes
+
+        Returns True if the patterns changed. A fetch whose hash matches the
+        last one is skipped without touching the patterns at all; otherwise
+        the fetch replaces the location's patterns, so slots the studio has
+        dropped stop being predicted.
+        """
+        schedule_hash = schedule_hash or self.schedule_hash(schedule_data)
+        if self.pattern_hashes.get(location) == schedule_hash and location in self.schedule_patterns:
+            return False
+
+        self.schedule_patterns[location] = self.analyze_schedule_pattern(schedule_data)
+        self.pattern_hashes[location] = schedule_hash
+        return True
+
+    def generate_schedule_from_patterns(self, location, patterns=None):
+        """Lay the weekly patterns for a location over every day of next month"""
+        patterns = self.schedule_patterns.get(location, {}) if patterns is None else patterns
         next_month = datetime.datetime.now() + datetime.timedelta(days=32)
         next_month = next_month.replace(day=1)
         last_day = calendar.monthrange(next_month.year, next_month.month)[1]
@@ -315,20 +461,75 @@ class ScheduleManager:
         
         return predicted_schedule
 
+    def predict_next_month_schedule(self, location):
+        """Predict next month's schedule based on current patterns"""
+        # Fetch current schedule and rebuild the cached patterns from it
+        current_schedule = self.fetch_current_schedule(location)
+        if self.update_schedule_patterns(location, current_schedule):
+            self.save_schedule_patterns()
+        
+        # Generate next month's schedule
+        return self.generate_schedule_from_patterns(location)
+
     def get_mirrored_schedule(self, location):
         """Get the mirrored schedule for the next month"""
         # Check if we have cached patterns
         if location not in self.schedule_patterns:
             # If not, fetch and analyze current schedule
-            current_schedule = self.fetch_current_schedule(location)
-            patterns = self.analyze_schedule_pattern(current_schedule)
-            self.schedule_patterns[location] = patterns
-            self.save_schedule_patterns()
+            return self.predict_next_month_schedule(location)
         
-        # Generate next month's schedule
-        return self.predict_next_month_schedule(location)
+        # Generate next month's schedule from the cached patterns
+        return self.generate_schedule_from_patterns(location)
+
+    def predict_all_locations(self, locations=None, max_workers=None):
+        """Predict next month's schedule for every configured location at once
+
+        Every location's weeks are fetched concurrently over the shared
+        session (the AJAX grid needs no browser), and the pages are parsed
+        in a process pool. The results replace the cached patterns here
+        and are saved once. Returns {location: predicted schedule}.
+        """
+        locations = list(locations or self.locations)
+        start = get_this_sunday().date()
+        dates = [(start + datetime.timedelta(weeks=i)).strftime("%Y-%m-%d") for i in range(WEEKS_AHEAD)]
+        pages = {location: [] for location in locations}
+        failed = set()
+        for result in fetch_all_schedules(locations, dates, session=self.sessions.session()):
+            if result.error:
+                failed.add(result.slug)
+            pages[result.slug].append(result.html)
+
+        changed = False
+        fetched = [location for location in locations if location not in failed]
+        for location in failed:
+            logger.warning(f"Could not fetch schedule for {location}, using cached patterns")
+        with ProcessPoolExecutor(max_workers=max_workers or len(fetched) or 1) as pool:
+            parsed = pool.map(_schedule_data_from_pages, fetched, [pages[l] for l in fetched])
+            for location, schedule_data in zip(fetched, parsed):
+                if not schedule_data:
+                    logger.warning(f"No classes on the schedule for {location}, using cached patterns")
+                    continue
+                changed |= self.update_schedule_patterns(location, schedule_data)
+        if changed:
+            self.save_schedule_patterns()
+        return {location: self.generate_schedule_from_patterns(location) for location in locations}
+
+def _schedule_data_from_pages(location, pages):
+    """Process-pool worker: one location's fetched weeks as schedule_data dicts"""
+    return [
+        {
+            'day_of_week': record.weekday_name,
+            'time': record.time,
+            'class_type': record.name,
+            'coach': record.teacher,
+            'date': record.date
+        }
+        for html in pages if html
+        for record in parse_records(html, location)
+    ]
 
 def main():
+    metrics.configure()
     # Example usage
     manager = ScheduleManager()
     
@@ -349,14 +550,17 @@ def main():
         coach="Megha Doshi"
     )
     
-    # Start monitoring for schedule release
-    while True:
-        if manager.check_schedule_released():
-            manager.book_scheduled_classes()
-            break
-        else:
-            logger.info("Waiting for schedule release...")
-            time.sleep(3600)  # Check every hour
+    # Book what's already published now; warm up just before the release
+    # for the rest, then book it as soon as the new weeks actually show up
+    manager.book_scheduled_classes()
+    if any(c['status'] == 'scheduled' and manager.awaits_release(c) for c in manager.scheduled_classes):
+        watcher = ReleaseWatcher({c['location'] for c in manager.scheduled_classes},
+                                 release_at=manager.get_schedule_release_date()).start()
+        try:
+            ReleaseSniper(manager, watcher=watcher).run()
+        finally:
+            watcher.stop()
+    manager.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+
+from metrics import timed
+
+
+class ScheduleStreamWriter:
+    """Write class records out week by week as they are parsed.
+
+    Each record is serialized exactly once. The line goes straight to the
+    NDJSON stream (if any) and into every consolidated JSON array, which
+    are built in temp files and renamed into place on commit() so readers
+    never see a half-written file.
+    """
+
+    def __init__(self, json_paths, ndjson_path=None):
+        self.count = 0
+        self._pending = []  # (tmp_path, final_path, file)
+        for path in json_paths:
+            directory = os.path.dirname(os.path.abspath(path))
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+            except OSError as e:
+                print(f"❌ Could not open {path} for writing: {e}")
+                continue
+            self._pending.append((tmp_path, path, os.fdopen(fd, "w", encoding="utf-8")))
+
+        self._ndjson = open(ndjson_path, "w", encoding="utf-8") if ndjson_path else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+    def write_week(self, records):
+        """Serialize one week's records and push them to every output"""
+        if not records:
+            return
+        lines = [json.dumps(record) for record in records]
+        if self._ndjson is not None:
+            self._ndjson.write("\n".join(lines) + "\n")
+            self._ndjson.flush()
+        chunk = ",\n".join(lines)
+        prefix = ",\n" if self.count else "[\n"
+        for _, _, f in self._pending:
+            f.write(prefix + chunk)
+        self.count += len(records)
+
+    @timed("output_commit")
+    def commit(self):
+        """Close the JSON arrays and atomically move them into place"""
+        suffix = "\n]\n" if self.count else "[]\n"
+        for tmp_path, path, f in self._pending:
+            f.write(suffix)
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+            os.chmod(tmp_path, 0o644)  # mkstemp creates files owner-only
+            os.replace(tmp_path, path)
+        self._pending = []
+        self._close_ndjson()
+
+    def abort(self):
+        """Discard the consolidated outputs, leaving existing files untouched"""
+        for tmp_path, _, f in self._pending:
+            f.close()
+            os.unlink(tmp_path)
+        self._pending = []
+        self._close_ndjson()
+
+    @property
+    def paths(self):
+        return [path for _, path, _ in self._pending]
+
+    def _close_ndjson(self):
+        if self._ndjson is not None:
+            self._ndjson.close()
+            self._ndjson = None
@@ -0,0 +1,132 @@
+import re
+from datetime import date
+
+from metrics import timer
+from schedule_records import records_from_dicts
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml is optional, fall back to BeautifulSoup
+    lxml_html = None
+
+
+def parse_classes_bs4(html, with_links=False):
+    """Parse the schedule grid with BeautifulSoup (reference implementation)"""
+    from bs4 import BeautifulSoup  # only paid for by callers that pick this backend
+
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+
+    for day in soup.select(".schedule-day"):
+        date_tag = day.select_one(".schedule-day-header-date")
+        date_str = date_tag.text.strip() if date_tag else "Unknown"
+
+        for li in day.select("ul.classes > li"):
+            name_tag = li.select_one("h4.class-name")
+            time_tag = li.select_one("div.class-time")
+            teacher_tag = li.select_one("div.class-teacher")
+            status_tag = li.select_one("div.class-status")
+
+            results.append({
+                "date": date_str,
+                "name": name_tag.text.strip() if name_tag else "",
+                "time": time_tag.text.strip() if time_tag else "",
+                "teacher": teacher_tag.text.strip() if teacher_tag else "",
+                "status": status_tag.text.strip() if status_tag else ""
+            })
+            if with_links:
+                link_tag = li.select_one("div.class-cta a[href]")
+                results[-1]["link"] = link_tag["href"] if link_tag else ""
+
+    return results
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml_html is not None:
+    # Compiled once; each mirrors one of the CSS selectors in parse_classes_bs4
+    _DAYS = etree.XPath(f"//*[{_has_class('schedule-day')}]")
+    _DATE = etree.XPath(f"(.//*[{_has_class('schedule-day-header-date')}])[1]")
+    _CLASSES = etree.XPath(f".//ul[{_has_class('classes')}]/li")
+    _FIELDS = (
+        ("name", etree.XPath(f"(.//h4[{_has_class('class-name')}])[1]")),
+        ("time", etree.XPath(f"(.//div[{_has_class('class-time')}])[1]")),
+        ("teacher", etree.XPath(f"(.//div[{_has_class('class-teacher')}])[1]")),
+        ("status", etree.XPath(f"(.//div[{_has_class('class-status')}])[1]")),
+    )
+    _LINK = etree.XPath(f"(.//div[{_has_class('class-cta')}]//a/@href)[1]")
+
+
+def parse_classes_lxml(html, with_links=False):
+    """Parse the schedule grid with lxml and precompiled XPath lookups"""
+    if not html or not html.strip():
+        return []
+    root = lxml_html.fromstring(html)
+    results = []
+
+    for day in _DAYS(root):
+        date_tag = _DATE(day)
+        date_str = date_tag[0].text_content().strip() if date_tag else "Unknown"
+
+        for li in _CLASSES(day):
+            record = {"date": date_str}
+            for key, lookup in _FIELDS:
+                tag = lookup(li)
+                record[key] = tag[0].text_content().strip() if tag else ""
+            if with_links:
+                link = _LINK(li)
+                record["link"] = str(link[0]) if link else ""
+            results.append(record)
+
+    return results
+
+
+PARSERS = {"bs4": parse_classes_bs4}
+if lxml_html is not None:
+    PARSERS["lxml"] = parse_classes_lxml
+
+DEFAULT_PARSER = "lxml" if "lxml" in PARSERS else "bs4"
+
+
+def parse_classes(html, backend=None, with_links=False):
+    """Parse schedule HTML into class records using the chosen backend
+
+    `with_links` adds each class's Reserve/Waitlist href as "link".
+    """
+    backend = backend or DEFAULT_PARSER
+    with timer("parse", backend=backend):
+        return PARSERS[backend](html, with_links)
+
+
+NAV_DATE_RE = re.compile(r'data-date="(\d{4}-\d{2}-\d{2})"\s+class="schedule-(?:prev|next)"')
+
+
+def schedule_anchor_date(html):
+    """Date of the grid's prev/next week link, used to give MM/DD a year"""
+    match = NAV_DATE_RE.search(html or "")
+    return date.fromisoformat(match.group(1)) if match else None
+
+
+def parse_records(html, location=None, backend=None):
+    """Parse schedule HTML straight into typed ClassRecords, booking links included"""
+    return records_from_dicts(parse_classes(html, backend, with_links=True), location,
+                              schedule_anchor_date(html))
+
+
+SEAT_RE = re.compile(
+    r'class="class-status">([^<]*)</div>(?:(?!</li>).){0,400}?'
+    r'href="/(book|waitlist)/[^"/]*/[^"/]+/(\d+)"',
+    re.DOTALL,
+)
+
+
+def seat_counts(html):
+    """{registration ID: (action, status text)} from one regex pass, without building a tree
+
+    For re-checking seat availability, where only the status and booking
+    link of each class matter.
+    """
+    with timer("seat_counts"):
+        return {m.group(3): (m.group(2), m.group(1).strip()) for m in SEAT_RE.finditer(html or "")}
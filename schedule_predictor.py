@@ -0,0 +1,106 @@
+import calendar
+from collections import defaultdict
+from datetime import date
+
+from schedule_records import UNKNOWN
+
+
+def week_of(day):
+    """Monday-based week number, comparable across years"""
+    return (day.toordinal() - 1) // 7
+
+
+def base_name(name):
+    """Drop themed suffixes: "Studio 1 | Signature50: Full Body | Summer Bops" -> first two parts"""
+    return " | ".join(name.split(" | ")[:2])
+
+
+def slot_key(record):
+    """A recurring slot: where, which weekday and time, which class, who teaches"""
+    return (record.location, record.weekday, record.start_min, record.studio_room,
+            record.family or base_name(record.name), record.teacher)
+
+
+class RecurringSlotModel:
+    """Learns which classes recur week to week from scraped history.
+
+    Each slot's confidence is the share of observed weeks in which it
+    appeared, counting only weeks where that location had any class on
+    that weekday (so a partially scraped week does not count against
+    days it never covered). A class seen in 11 of the last 12 weeks
+    scores 0.92 and a one-off themed class scores low. Training is a
+    single pass over the records.
+    """
+
+    def __init__(self, weeks=12):
+        self.weeks = weeks
+        self.slot_weeks = defaultdict(set)
+        self.day_weeks = defaultdict(set)
+        self.latest = {}
+
+    def fit(self, records, until=None):
+        """Learn from records in the `weeks` weeks before `until` (default: all)"""
+        records = [r for r in records if r.day is not None and r.start_min != UNKNOWN]
+        if not records:
+            return self
+        last_week = week_of(until) - 1 if until else max(week_of(r.day) for r in records)
+        first_week = last_week - self.weeks + 1
+        for record in records:
+            week = week_of(record.day)
+            if not first_week <= week <= last_week:
+                continue
+            key = slot_key(record)
+            self.slot_weeks[key].add(week)
+            self.day_weeks[record.location, record.weekday].add(week)
+            seen = self.latest.get(key)
+            if seen is None or seen.day < record.day:
+                self.latest[key] = record
+        return self
+
+    def confidences(self):
+        """{slot key: fraction of observed weeks the slot appeared in}"""
+        return {
+            key: len(weeks) / len(self.day_weeks[key[0], key[1]])
+            for key, weeks in self.slot_weeks.items()
+        }
+
+    def predict_slots(self, days, min_confidence=0.5, include_off_peak=False):
+        """Yield (date, template record, confidence) for each date in `days`, in date/time order"""
+        by_weekday = defaultdict(list)
+        for key, confidence in self.confidences().items():
+            if confidence < min_confidence:
+                continue
+            record = self.latest[key]
+            if record.off_peak and not include_off_peak:
+                continue
+            by_weekday[record.weekday].append((record, confidence))
+        for slots in by_weekday.values():
+            slots.sort(key=lambda slot: (slot[0].start_min, slot[0].location, slot[0].studio_room))
+
+        for day in days:
+            for record, confidence in by_weekday.get(day.weekday(), ()):
+                yield day, record, confidence
+
+    def predict_days(self, days, **kwargs):
+        """Predicted class dicts, in the scraper's output shape plus confidence"""
+        predicted = []
+        for day, record, confidence in self.predict_slots(days, **kwargs):
+            item = record.to_dict()
+            item["name"] = base_name(record.name)
+            item["date"] = day.strftime("%m/%d")
+            item["status"] = "predicted"
+            item["confidence"] = round(confidence, 2)
+            predicted.append(item)
+        return predicted
+
+    def predict_month(self, year, month, **kwargs):
+        _, last_day = calendar.monthrange(year, month)
+        days = [date(year, month, day) for day in range(1, last_day + 1)]
+        return self.predict_days(days, **kwargs)
+
+
+def next_month(today=None):
+    today = today or date.today()
+    if today.month == 12:
+        return today.year + 1, 1
+    return today.year, today.month + 1
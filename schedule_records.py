@@ -0,0 +1,239 @@
+import re
+from array import array
+from dataclasses import dataclass
+from datetime import date as date_cls
+
+TIME_RE = re.compile(
+    r"(\d{1,2}):(\d{2})\s*([ap]m)\s*-\s*(\d{1,2}):(\d{2})\s*([ap]m)(?:\s*\((\d+)\s*min\))?",
+    re.IGNORECASE,
+)
+STATUS_RE = re.compile(r"(\d+)\s+of\s+(\d+)")
+STUDIO_RE = re.compile(r"^\s*Studio\s+(\d+)\s*\|", re.IGNORECASE)
+FAMILY_RE = re.compile(r"\b([A-Z][a-z]+\d{2})\b")
+MD_DATE_RE = re.compile(r"^(\d{1,2})/(\d{1,2})$")
+ISO_DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+CLOCK_RE = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*([ap]m)?", re.IGNORECASE)
+LINK_RE = re.compile(r"/(book|waitlist)/[^/]*/[^/]+/(\d+)")
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Sentinel for "unknown" in integer fields, so columns stay plain int arrays
+UNKNOWN = -1
+
+
+def clock_to_minutes(hour, minute, meridiem):
+    """Convert a 12-hour clock time to minutes after midnight"""
+    hour = int(hour) % 12
+    if meridiem.lower() == "pm":
+        hour += 12
+    return hour * 60 + int(minute)
+
+
+def parse_time_range(text):
+    """Parse "7:15am - 8:05am (50 min)" into (start, end, duration) minutes"""
+    match = TIME_RE.search(text or "")
+    if not match:
+        return UNKNOWN, UNKNOWN, UNKNOWN
+    h1, m1, ap1, h2, m2, ap2, duration = match.groups()
+    start = clock_to_minutes(h1, m1, ap1)
+    end = clock_to_minutes(h2, m2, ap2)
+    if duration is None:
+        duration = (end - start) % (24 * 60)
+    return start, end, int(duration)
+
+
+def parse_clock(text):
+    """Minutes after midnight for "18:00", "6:15pm" or "6:15pm - 7:05pm (50 min)" """
+    match = CLOCK_RE.match(text or "")
+    if not match:
+        return UNKNOWN
+    hour, minute, meridiem = match.groups()
+    if meridiem:
+        return clock_to_minutes(hour, minute or 0, meridiem)
+    return int(hour) * 60 + int(minute or 0)
+
+
+def parse_link(href):
+    """Parse "/book//chelsea/598896" into ("book", "598896"); ("", "") if absent"""
+    match = LINK_RE.search(href or "")
+    return (match.group(1), match.group(2)) if match else ("", "")
+
+
+def parse_status(text):
+    """Parse "5 of 13 open" into (open, total); UNKNOWN for e.g. "predicted" """
+    match = STATUS_RE.search(text or "")
+    if not match:
+        return UNKNOWN, UNKNOWN
+    return int(match.group(1)), int(match.group(2))
+
+
+def infer_year(month, day, today=None):
+    """Pick the year that puts MM/DD closest to today.
+
+    Scraped dates carry no year; a schedule fetched in late December can
+    already contain January classes.
+    """
+    today = today or date_cls.today()
+    best = None
+    for year in (today.year - 1, today.year, today.year + 1):
+        try:
+            candidate = date_cls(year, month, day)
+        except ValueError:
+            continue
+        if best is None or abs((candidate - today).days) < abs((best - today).days):
+            best = candidate
+    return best.year if best else today.year
+
+
+def parse_date(text, today=None):
+    """Parse "05/18" or "2025-05-18" into a date, or None"""
+    text = (text or "").strip()
+    match = ISO_DATE_RE.match(text)
+    if match:
+        year, month, day = (int(g) for g in match.groups())
+    else:
+        match = MD_DATE_RE.match(text)
+        if not match:
+            return None
+        month, day = int(match.group(1)), int(match.group(2))
+        year = infer_year(month, day, today)
+    try:
+        return date_cls(year, month, day)
+    except ValueError:
+        return None
+
+
+def class_family(name):
+    """Canonical class family from a scraped name, e.g. "Signature50" """
+    match = FAMILY_RE.search(name or "")
+    return match.group(1) if match else ""
+
+
+@dataclass(slots=True)
+class ClassRecord:
+    """One scheduled class with its string fields parsed once up front"""
+    date: str
+    name: str
+    time: str
+    teacher: str
+    status: str
+    location: str
+    day: date_cls
+    weekday: int
+    start_min: int
+    end_min: int
+    duration: int
+    open_spots: int
+    total_spots: int
+    studio_room: int
+    family: str
+    off_peak: bool
+    action: str = ""
+    registration_id: str = ""
+
+    @classmethod
+    def from_dict(cls, item, location=None, today=None):
+        """Build a record from a scraped/predicted dict
+
+        A "week_of" ISO date (written by the scraper) anchors the MM/DD
+        date's year; without one it is guessed relative to `today`.
+        """
+        if item.get("week_of"):
+            today = date_cls.fromisoformat(item["week_of"])
+        name = item.get("name", "")
+        time = item.get("time", "")
+        status = item.get("status", "")
+        day = parse_date(item.get("date", ""), today)
+        start, end, duration = parse_time_range(time)
+        open_spots, total_spots = parse_status(status)
+        studio = STUDIO_RE.match(name)
+        action, registration_id = parse_link(item.get("link", ""))
+        return cls(
+            date=item.get("date", ""),
+            name=name,
+            time=time,
+            teacher=item.get("teacher", ""),
+            status=status,
+            location=location or item.get("location", ""),
+            day=day,
+            weekday=day.weekday() if day else UNKNOWN,
+            start_min=start,
+            end_min=end,
+            duration=duration,
+            open_spots=open_spots,
+            total_spots=total_spots,
+            studio_room=int(studio.group(1)) if studio else UNKNOWN,
+            family=class_family(name),
+            off_peak="off-peak" in name.lower(),
+            action=action,
+            registration_id=registration_id,
+        )
+
+    @property
+    def is_full(self):
+        return self.open_spots == 0
+
+    @property
+    def weekday_name(self):
+        return WEEKDAYS[self.weekday] if self.weekday != UNKNOWN else ""
+
+    def to_dict(self):
+        """The original scraped dict shape, for JSON output"""
+        item = {
+            "date": self.date,
+            "name": self.name,
+            "time": self.time,
+            "teacher": self.teacher,
+            "status": self.status,
+        }
+        if self.location:
+            item["location"] = self.location
+        return item
+
+
+def records_from_dicts(items, location=None, today=None):
+    return [ClassRecord.from_dict(item, location, today) for item in items]
+
+
+class RecordBatch:
+    """Column-oriented view of many ClassRecords for bulk filtering.
+
+    Integer fields are stored as typed arrays and strings as lists, so a
+    filter is a single pass over one column rather than a walk over
+    objects. Filters return index lists that can be fed to take().
+    """
+
+    INT_COLUMNS = ("weekday", "start_min", "end_min", "duration",
+                   "open_spots", "total_spots", "studio_room")
+    STR_COLUMNS = ("date", "name", "time", "teacher", "status", "location", "family")
+
+    def __init__(self, records=()):
+        self.records = list(records)
+        for column in self.INT_COLUMNS:
+            setattr(self, column, array("h", (getattr(r, column) for r in self.records)))
+        for column in self.STR_COLUMNS:
+            setattr(self, column, [getattr(r, column) for r in self.records])
+        self.ordinal = array("l", (r.day.toordinal() if r.day else 0 for r in self.records))
+        self.off_peak = array("b", (r.off_peak for r in self.records))
+
+    @classmethod
+    def from_dicts(cls, items, location=None, today=None):
+        return cls(records_from_dicts(items, location, today))
+
+    def __len__(self):
+        return len(self.records)
+
+    def where(self, column, predicate):
+        """Indices whose `column` value satisfies `predicate`"""
+        values = getattr(self, column)
+        return [i for i, value in enumerate(values) if predicate(value)]
+
+    def where_equal(self, column, value):
+        values = getattr(self, column)
+        return [i for i, v in enumerate(values) if v == value]
+
+    def full(self):
+        return self.where_equal("open_spots", 0)
+
+    def take(self, indices):
+        return [self.records[i] for i in indices]
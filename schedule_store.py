@@ -0,0 +1,200 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+
+from metrics import timed
+from schedule_records import ClassRecord, UNKNOWN
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrapes (
+    id INTEGER PRIMARY KEY,
+    scraped_at TEXT NOT NULL
+);
+
+-- Every scraped version of every class, one row per (class, scrape)
+CREATE TABLE IF NOT EXISTS class_snapshots (
+    scrape_id INTEGER NOT NULL REFERENCES scrapes(id),
+    location TEXT NOT NULL,
+    day TEXT NOT NULL,
+    start_min INTEGER NOT NULL,
+    studio_room INTEGER NOT NULL,
+    weekday INTEGER NOT NULL,
+    end_min INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    family TEXT NOT NULL,
+    off_peak INTEGER NOT NULL,
+    teacher TEXT NOT NULL,
+    time TEXT NOT NULL,
+    status TEXT NOT NULL,
+    open_spots INTEGER NOT NULL,
+    total_spots INTEGER NOT NULL,
+    PRIMARY KEY (location, day, start_min, studio_room, scrape_id)
+) WITHOUT ROWID;
+
+-- Latest known state of each class
+CREATE TABLE IF NOT EXISTS classes (
+    location TEXT NOT NULL,
+    day TEXT NOT NULL,
+    start_min INTEGER NOT NULL,
+    studio_room INTEGER NOT NULL,
+    weekday INTEGER NOT NULL,
+    end_min INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    family TEXT NOT NULL,
+    off_peak INTEGER NOT NULL,
+    teacher TEXT NOT NULL,
+    time TEXT NOT NULL,
+    status TEXT NOT NULL,
+    open_spots INTEGER NOT NULL,
+    total_spots INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (location, day, start_min, studio_room)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_classes_slot ON classes (weekday, start_min, day);
+CREATE INDEX IF NOT EXISTS idx_classes_teacher ON classes (teacher, day);
+CREATE INDEX IF NOT EXISTS idx_classes_full ON classes (day) WHERE open_spots = 0;
+CREATE INDEX IF NOT EXISTS idx_snapshots_slot ON class_snapshots (weekday, start_min, day);
+"""
+
+COLUMNS = ("location", "day", "start_min", "studio_room", "weekday", "end_min", "duration",
+           "name", "family", "off_peak", "teacher", "time", "status", "open_spots", "total_spots")
+
+
+def _row(record):
+    return (
+        record.location, record.day.isoformat(), record.start_min, record.studio_room,
+        record.weekday, record.end_min, record.duration, record.name, record.family,
+        int(record.off_peak), record.teacher, record.time, record.status,
+        record.open_spots, record.total_spots,
+    )
+
+
+class ScheduleStore:
+    """SQLite-backed history of every scraped schedule.
+
+    Classes are keyed by (location, day, start_min, studio_room). Each
+    ingest adds a snapshot row per class and upserts the latest state, so
+    lookups by slot, teacher or fullness hit an index instead of reloading
+    every JSON file.
+    """
+
+    def __init__(self, path="schedule.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    @timed("store_ingest")
+    def ingest(self, records, scraped_at=None):
+        """Bulk-upsert one scrape's records in a single transaction"""
+        scraped_at = (scraped_at or datetime.now()).isoformat(timespec="seconds")
+        rows = [_row(r) for r in records if r.day is not None and r.start_min != UNKNOWN]
+        if not rows:
+            return 0
+
+        placeholders = ", ".join("?" * len(COLUMNS))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[4:])
+        with self.conn:
+            scrape_id = self.conn.execute(
+                "INSERT INTO scrapes (scraped_at) VALUES (?)", (scraped_at,)
+            ).lastrowid
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO class_snapshots (scrape_id, {', '.join(COLUMNS)}) "
+                f"VALUES (?, {placeholders})",
+                [(scrape_id,) + row for row in rows],
+            )
+            self.conn.executemany(
+                f"INSERT INTO classes ({', '.join(COLUMNS)}, first_seen, last_seen) "
+                f"VALUES ({placeholders}, ?, ?) "
+                f"ON CONFLICT (location, day, start_min, studio_room) DO UPDATE SET "
+                f"{updates}, last_seen = excluded.last_seen",
+                [row + (scraped_at, scraped_at) for row in rows],
+            )
+        return len(rows)
+
+    def _query(self, sql, params=()):
+        return [self._record(row) for row in self.conn.execute(sql, params)]
+
+    @staticmethod
+    def _record(row):
+        day = date.fromisoformat(row["day"])
+        return ClassRecord(
+            date=day.strftime("%m/%d"), name=row["name"], time=row["time"],
+            teacher=row["teacher"], status=row["status"], location=row["location"],
+            day=day, weekday=row["weekday"], start_min=row["start_min"],
+            end_min=row["end_min"], duration=row["duration"],
+            open_spots=row["open_spots"], total_spots=row["total_spots"],
+            studio_room=row["studio_room"], family=row["family"],
+            off_peak=bool(row["off_peak"]),
+        )
+
+    def classes_at(self, weekday, start_min, weeks=12, location=None, until=None):
+        """Latest state of every class in a weekday/time slot over the last N weeks"""
+        until = until or date.today()
+        since = until - timedelta(weeks=weeks)
+        sql = ("SELECT * FROM classes WHERE weekday = ? AND start_min = ? "
+               "AND day BETWEEN ? AND ?")
+        params = [weekday, start_min, since.isoformat(), until.isoformat()]
+        if location:
+            sql += " AND location = ?"
+            params.append(location)
+        return self._query(sql + " ORDER BY day, location, studio_room", params)
+
+    def by_teacher(self, teacher, since=None):
+        sql = "SELECT * FROM classes WHERE teacher = ?"
+        params = [teacher]
+        if since:
+            sql += " AND day >= ?"
+            params.append(since.isoformat())
+        return self._query(sql + " ORDER BY day, start_min", params)
+
+    def full_classes(self, since=None, until=None):
+        sql = "SELECT * FROM classes WHERE open_spots = 0"
+        params = []
+        if since:
+            sql += " AND day >= ?"
+            params.append(since.isoformat())
+        if until:
+            sql += " AND day <= ?"
+            params.append(until.isoformat())
+        return self._query(sql + " ORDER BY day, start_min", params)
+
+    def classes_between(self, since=None, until=None, location=None):
+        """Latest state of every class in a date range"""
+        sql = "SELECT * FROM classes WHERE 1 = 1"
+        params = []
+        if since:
+            sql += " AND day >= ?"
+            params.append(since.isoformat())
+        if until:
+            sql += " AND day <= ?"
+            params.append(until.isoformat())
+        if location:
+            sql += " AND location = ?"
+            params.append(location)
+        return self._query(sql + " ORDER BY day, start_min", params)
+
+    def snapshots(self, location, day, start_min, studio_room):
+        """Every scraped version of one class, oldest first, with its scrape time"""
+        rows = self.conn.execute(
+            "SELECT s.scraped_at, c.* FROM class_snapshots c JOIN scrapes s ON s.id = c.scrape_id "
+            "WHERE c.location = ? AND c.day = ? AND c.start_min = ? AND c.studio_room = ? "
+            "ORDER BY s.scraped_at",
+            (location, day.isoformat(), start_min, studio_room),
+        )
+        return [(row["scraped_at"], self._record(row)) for row in rows]
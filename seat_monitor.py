@@ -0,0 +1,205 @@
+import datetime
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from Solidcore_scraper import (
+    SCHEDULE_URL, WEEKS_AHEAD, fetch_all_schedules, fetch_solidcore_schedule,
+    get_session, get_this_sunday,
+)
+from schedule_cache import content_hash
+from schedule_parser import seat_counts
+from schedule_records import parse_date, parse_status
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads"""
+
+    def __init__(self, rate):
+        self.spacing = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.spacing
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SeatMonitor:
+    """Watches full classes and books them when a spot opens
+
+    Watches every wishlist class marked "waitlist" (the BookingExecutor's
+    fallback for a class that was full). One scan locates the (studio,
+    week) each one is in; after that only those weeks are re-fetched,
+    every `interval` seconds at no more than `max_requests_per_second`.
+    A week whose HTML hash is unchanged is skipped; otherwise only the
+    status and link of each class are pulled out (seat_counts), and a
+    watched class with open spots is booked through
+    ScheduleManager.book_class. Detection-to-booked latency is recorded
+    for each booking.
+    """
+
+    def __init__(self, manager, interval=30.0, max_requests_per_second=2.0, max_workers=4,
+                 weeks=WEEKS_AHEAD, session=None, url=SCHEDULE_URL):
+        self.manager = manager
+        self.interval = interval
+        self.limiter = RateLimiter(max_requests_per_second)
+        self.max_workers = max_workers
+        self.weeks = weeks
+        self.session = session or get_session()
+        self.url = url
+        self.book_session = None
+        self.watched = {}  # registration ID -> class_info
+        self.week_of = {}  # registration ID -> (slug, week)
+        self.digests = {}  # (slug, week) -> content hash
+        self.open_spots = {}  # registration ID -> last seen open spots
+        self.latencies_ms = []
+        self.fetches = 0
+        self._stop = threading.Event()
+
+    def watch_list(self):
+        today = datetime.date.today()
+        return {c['registration_id']: c for c in self.manager.scheduled_classes
+                if c['status'] == 'waitlist' and c.get('registration_id')
+                and not (parse_date(c.get('date')) or today) < today}
+
+    def locate(self, start=None):
+        """Find which (studio, week) holds each watched class with one concurrent scan"""
+        self.watched = self.watch_list()
+        if not self.watched:
+            return {}
+        # Start with the current week: a waitlisted class later this week is the likeliest to open up
+        start = start or get_this_sunday().date()
+        dates = [(start + timedelta(weeks=i)).strftime("%Y-%m-%d") for i in range(self.weeks)]
+        slugs = sorted({c['location'] for c in self.watched.values()})
+        for result in fetch_all_schedules(slugs, dates, session=self.session, url=self.url):
+            if not result.html:
+                continue
+            week = (result.slug, result.date)
+            self.digests[week] = content_hash(result.html)
+            for registration_id, (_, status) in seat_counts(result.html).items():
+                if registration_id in self.watched:
+                    self.week_of[registration_id] = week
+                    self.open_spots[registration_id] = parse_status(status)[0]
+        for registration_id in set(self.watched) - set(self.week_of):
+            logger.warning(f"Watched class {registration_id} is not on the schedule; ignoring it")
+            del self.watched[registration_id]
+        # Anything already open is picked up by the first check
+        for week in set(self.week_of.values()):
+            self.digests.pop(week, None)
+        return self.week_of
+
+    def check_week(self, week):
+        """Re-fetch one week and book any watched class in it that has opened
+
+        Runs on pool threads, so it leaves `watched` and `week_of` alone;
+        check_all drops the booked classes once every week is done.
+        """
+        self.limiter.wait()
+        fetched_at = time.perf_counter()
+        html = fetch_solidcore_schedule(*week, session=self.session, url=self.url)
+        self.fetches += 1
+        digest = content_hash(html)
+        if digest == self.digests.get(week):
+            return []
+        self.digests[week] = digest
+
+        booked = []
+        seats = seat_counts(html)
+        for registration_id in [r for r, w in self.week_of.items() if w == week]:
+            action, status = seats.get(registration_id, ("", ""))
+            open_spots = parse_status(status)[0]
+            previous = self.open_spots.get(registration_id)
+            self.open_spots[registration_id] = open_spots
+            if open_spots <= 0 and action != "book":
+                continue
+            detected_at = time.perf_counter()
+            logger.info(f"Spot opened in {registration_id} ({previous} -> {open_spots} open)")
+            class_info = self.watched[registration_id]
+            if self.manager.book_class(class_info, session=self.book_session):
+                latency_ms = (time.perf_counter() - detected_at) * 1000
+                self.latencies_ms.append(latency_ms)
+                self.manager.update_scheduled_class(
+                    class_info, status='booked', last_checked=datetime.datetime.now().isoformat())
+                logger.info(f"Booked {registration_id} {latency_ms:.0f} ms after detection "
+                            f"({(time.perf_counter() - fetched_at) * 1000:.0f} ms after the fetch started)")
+                booked.append(class_info)
+            else:
+                # Check this week again next round even if it doesn't change
+                self.digests.pop(week, None)
+        return booked
+
+    def check_all(self, pool):
+        """One round over every week holding a watched class"""
+        booked = []
+        for result in pool.map(self._safe_check, sorted(set(self.week_of.values()))):
+            booked.extend(result)
+        for class_info in booked:
+            del self.watched[class_info['registration_id']]
+            del self.week_of[class_info['registration_id']]
+        if booked:
+            self.manager.sync_scheduled_classes()
+        return booked
+
+    def _safe_check(self, week):
+        try:
+            return self.check_week(week)
+        except Exception as e:
+            logger.warning(f"Check of {week[0]} {week[1]} failed: {str(e)}")
+            return []
+
+    def run(self, rounds=None):
+        """Check until nothing is left to watch, `rounds` runs out or stop() is called"""
+        self.locate()
+        if not self.watched:
+            logger.info("No waitlisted classes to watch")
+            return
+        self.book_session = self.manager.sessions.session()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while self.week_of and not self._stop.is_set():
+                start = time.monotonic()
+                # A long watch can outlive the login; renewing it is a no-op until it's close
+                self.manager.sessions.ensure_fresh(by=datetime.datetime.now() + timedelta(seconds=self.interval))
+                self.check_all(pool)
+                if rounds is not None:
+                    rounds -= 1
+                    if rounds <= 0:
+                        break
+                self._stop.wait(max(0.0, self.interval - (time.monotonic() - start)))
+        self.report()
+
+    def stop(self):
+        self._stop.set()
+
+    def report(self):
+        """Log fetch count and detection-to-booked latency"""
+        logger.info(f"{self.fetches} fetches, {len(self.latencies_ms)} bookings, "
+                    f"{len(self.watched)} classes still watched")
+        if self.latencies_ms:
+            logger.info(f"Detection to booked: median {statistics.median(self.latencies_ms):.0f} ms, "
+                        f"max {max(self.latencies_ms):.0f} ms")
+
+
+def main():
+    import metrics
+    from schedule_manager import ScheduleManager
+
+    metrics.configure()
+    manager = ScheduleManager()
+    try:
+        SeatMonitor(manager).run()
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import io
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+COOKIES_FILE = "solidcore_cookies.json"
+AUTH_FAILURE_STATUSES = (401, 403)
+
+
+class _PlainDataUnpickler(pickle.Unpickler):
+    """Unpickles lists/dicts of plain values only, never arbitrary objects"""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"refusing to load {module}.{name} from a cookie file")
+
+
+def cookie_paths(path):
+    """(JSON path, legacy pickle path) for a cookie file given either name"""
+    base = os.path.splitext(path)[0]
+    return f"{base}.json", f"{base}.pkl"
+
+
+def read_cookie_file(path):
+    """{"cookies": [...], "timestamp": ..., "expires_at": ...} from a cookie file
+
+    A legacy solidcore_cookies.pkl is still read (through an unpickler
+    that only accepts plain data) when no JSON file exists yet. Both the
+    envelope above and a bare list of Selenium cookie dicts are accepted;
+    `expires_at` is an optional epoch time for the login as a whole.
+    """
+    json_path, pickle_path = cookie_paths(path)
+    if os.path.exists(json_path):
+        with open(json_path, "r") as f:
+            data = json.load(f)
+    elif os.path.exists(pickle_path):
+        with open(pickle_path, "rb") as f:
+            data = _PlainDataUnpickler(io.BytesIO(f.read())).load()
+    else:
+        data = []
+    if isinstance(data, list):
+        data = {"cookies": data}
+    return {"cookies": data.get("cookies", []), "timestamp": data.get("timestamp"),
+            "expires_at": data.get("expires_at")}
+
+
+def load_cookies(path):
+    """Selenium-style cookie dicts from a cookie file"""
+    return read_cookie_file(path)["cookies"]
+
+
+def save_cookies(path, cookies, expires_at=None):
+    """Atomically write cookies as JSON, readable only by the owner; returns the path"""
+    path = cookie_paths(path)[0]
+    data = {"cookies": cookies, "timestamp": time.time(), "expires_at": expires_at}
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def cookies_expire_at(cookies, expires_at=None):
+    """Earliest of the login's and its cookies' expiry times, or None"""
+    expiries = [c["expiry"] for c in cookies if c.get("expiry")]
+    if expires_at:
+        expiries.append(expires_at)
+    return datetime.fromtimestamp(min(expiries)) if expiries else None
+
+
+class SessionManager:
+    """One authenticated, pooled requests.Session per cookie file
+
+    Cookies are read once, and every booking, warm-up and fetch shares the
+    session's connection pool. The earliest cookie expiry is tracked so
+    ensure_fresh() can renew the login ahead of a release window rather
+    than discovering it from a failed booking. Renewal happens under a
+    lock and updates the existing session's cookie jar in place, so
+    threads holding the session keep their warm connections. `refresher`
+    is a callable returning fresh cookie dicts (e.g. from a logged-in
+    browser); without one, or when the cookie file has been rewritten
+    since it was read, the file is simply re-read. A login-wide expiry
+    that has run out can't be refreshed away; ensure_fresh() reports it
+    once and waits for a new cookie file.
+    """
+
+    def __init__(self, cookies_file=COOKIES_FILE, pool_size=16, refresh_margin=timedelta(hours=1),
+                 refresher=None):
+        self.cookies_file = cookie_paths(cookies_file)[0]
+        self.pool_size = pool_size
+        self.refresh_margin = refresh_margin
+        self.refresher = refresher
+        self.expires_at = None
+        self.login_expires_at = None
+        self.stale = False
+        self._session = None
+        self._loaded_mtime = None
+        self._gave_up_mtime = None
+        self._lock = threading.Lock()
+
+    def _mtime(self):
+        for path in cookie_paths(self.cookies_file):
+            if os.path.exists(path):
+                return os.path.getmtime(path)
+        return None
+
+    def _install(self, data):
+        # Caller holds the lock
+        jar = self._session.cookies
+        jar.clear()
+        for cookie in data["cookies"]:
+            jar.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""),
+                    path=cookie.get("path", "/"), expires=cookie.get("expiry"))
+        self.expires_at = cookies_expire_at(data["cookies"], data["expires_at"])
+        self.login_expires_at = datetime.fromtimestamp(data["expires_at"]) if data["expires_at"] else None
+        self.stale = False
+        self._loaded_mtime = self._mtime()
+        metrics.count("cookie_reload")
+
+    def session(self):
+        """The shared session, created and loaded with cookies on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+                    with metrics.timer("cookie_load", source="session"):
+                        data = read_cookie_file(self.cookies_file)
+                    if data["cookies"] and not os.path.exists(self.cookies_file):
+                        save_cookies(self.cookies_file, data["cookies"], data["expires_at"])
+                        logger.info(f"Migrated pickled cookies to {self.cookies_file}")
+                    self._install(data)
+        return self._session
+
+    def needs_refresh(self, by=None):
+        """Will the login have expired (or was it rejected) by `by` plus the margin?"""
+        self.session()
+        if self.stale:
+            return True
+        if self._mtime() != self._loaded_mtime:
+            return True
+        if self.expires_at is None:
+            return False
+        return self.expires_at <= (by or datetime.now()) + self.refresh_margin
+
+    def refresh(self):
+        """Reload cookies from the refresher (or the cookie file); returns the new expiry"""
+        self.session()
+        with self._lock, metrics.timer("cookie_refresh"):
+            # A newer cookie file (e.g. from `solidcore login`) wins over the refresher
+            if self.refresher is not None and self._mtime() == self._loaded_mtime:
+                # The refresher only renews cookies; the login itself expires when it did
+                expires_at = read_cookie_file(self.cookies_file)["expires_at"]
+                save_cookies(self.cookies_file, self.refresher(), expires_at)
+            self._install(read_cookie_file(self.cookies_file))
+        logger.info(f"Refreshed login cookies for {self.cookies_file}; "
+                    f"earliest expiry {self.expires_at or 'none'}")
+        return self.expires_at
+
+    def ensure_fresh(self, by=None):
+        """Refresh now if the login would not last until `by`; returns False if it still won't"""
+        if not self.needs_refresh(by):
+            return True
+        login_lapses = (self.login_expires_at is not None
+                        and self.login_expires_at <= (by or datetime.now()) + self.refresh_margin)
+        if login_lapses and self._mtime() == self._loaded_mtime:
+            # Refreshing cookies can't extend the login itself; only a new
+            # cookie file (from `solidcore login`) can, so say so once and wait
+            if self._gave_up_mtime != self._loaded_mtime:
+                self._gave_up_mtime = self._loaded_mtime
+                logger.warning(f"Login in {self.cookies_file} expires at {self.login_expires_at}, "
+                               f"before {by or 'now'}; run `solidcore login`")
+            return False
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Could not refresh login cookies: {str(e)}")
+        if self.needs_refresh(by):
+            logger.warning(f"Login cookies in {self.cookies_file} expire at {self.expires_at}, "
+                           f"before {by or 'now'}; run `solidcore login`")
+            return False
+        return True
+
+    def note_response(self, response):
+        """Mark the login stale if the site rejected it"""
+        if response.status_code in AUTH_FAILURE_STATUSES:
+            self.stale = True
+            metrics.count("auth_rejected")
+        return response
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+def browser_refresher(driver_pool, url="https://solidcore.co"):
+    """A refresher that reloads the site in a pooled, logged-in browser and takes its cookies"""
+    def refresh():
+        with driver_pool.driver() as driver:
+            driver.get(url)
+            return driver.get_cookies()
+    return refresh
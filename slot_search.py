@@ -0,0 +1,474 @@
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import chain, islice
+from urllib.parse import parse_qs, urlparse
+
+import metrics
+from Solidcore_scraper import DEFAULT_SLUG
+from registration_index import normalize_coach
+from schedule_records import UNKNOWN, WEEKDAYS, parse_clock, records_from_dicts
+from schedule_store import ScheduleStore
+from studio_registry import default_registry
+
+DB_PATH = "schedule.db"
+SCRAPED_JSON = "solidcore_schedule.json"
+PREDICTED_JSON = os.path.join("public", "predicted_next_month_schedule.json")
+SOURCES = ("scraped", "predicted")
+WEEKDAY_GROUPS = {"weekdays": (0, 1, 2, 3, 4), "weekends": (5, 6)}
+# Availability assumed for a slot that never appears in the scrape history
+NO_HISTORY = 0.5
+MERIDIEM_RE = re.compile(r"[ap]m\s*$", re.IGNORECASE)
+
+
+def parse_weekdays(text):
+    """ "weekdays", "sat,sun" or "Monday" -> sorted weekday numbers"""
+    days = set()
+    for part in re.sub(r"\s+", "", text or "").lower().split(","):
+        if not part:
+            continue
+        if part in WEEKDAY_GROUPS:
+            days.update(WEEKDAY_GROUPS[part])
+            continue
+        matches = [i for i, name in enumerate(WEEKDAYS) if name.lower().startswith(part[:3])]
+        if len(part) < 2 or len(matches) != 1:
+            raise ValueError(f"unknown day {part!r}")
+        days.update(matches)
+    return tuple(sorted(days))
+
+
+def parse_window(text):
+    """ "6-8pm", "6pm-8pm" or "18:00-20:00" -> (first, last) start minute, last exclusive"""
+    first, _, last = (text or "").partition("-")
+    meridiem = MERIDIEM_RE.search(last)
+    if meridiem and not MERIDIEM_RE.search(first):
+        first += meridiem.group(0)
+    start, end = parse_clock(first), parse_clock(last)
+    if UNKNOWN in (start, end) or end <= start:
+        raise ValueError(f"can't parse time window {text!r}")
+    return start, end
+
+
+@dataclass
+class SlotQuery:
+    """What a member is looking for; an empty field matches anything
+
+    `window` bounds the class start time, so "6-8pm" finds classes that
+    start from 6:00pm up to (not including) 8:00pm. `since` defaults to
+    today.
+    """
+    families: tuple = ()
+    teachers: tuple = ()
+    locations: tuple = ()
+    areas: tuple = ()
+    weekdays: tuple = ()
+    window: tuple = ()
+    since: date = None
+    until: date = None
+    sources: tuple = ()
+    include_full: bool = False
+    limit: int = 20
+
+    @classmethod
+    def from_params(cls, params):
+        """From URL query or CLI parameters
+
+        e.g. {"family": "Signature50", "days": "weekdays", "between": "6-8pm",
+        "area": "Manhattan"}. Values may be strings or lists of strings, and
+        comma-separated values are split.
+        """
+        def values(key):
+            raw = params.get(key) or ()
+            raw = [raw] if isinstance(raw, str) else raw
+            return tuple(v.strip() for item in raw for v in item.split(",") if v.strip())
+
+        def single(key):
+            found = values(key)
+            return found[-1] if found else None
+
+        sources = values("source")
+        unknown = set(sources) - set(SOURCES)
+        if unknown:
+            raise ValueError(f"unknown source {', '.join(sorted(unknown))}; use {' or '.join(SOURCES)}")
+        since, until = single("since"), single("until")
+        return cls(
+            families=values("family"),
+            teachers=values("teacher"),
+            locations=values("location"),
+            areas=values("area"),
+            weekdays=parse_weekdays(",".join(values("days"))),
+            window=parse_window(single("between")) if single("between") else (),
+            since=date.fromisoformat(since) if since else None,
+            until=date.fromisoformat(until) if until else None,
+            sources=sources,
+            include_full=(single("include_full") or "").lower() in ("1", "true", "yes"),
+            limit=int(single("limit") or 20),
+        )
+
+
+def historical_availability(store):
+    """{(location, weekday, start_min, teacher, studio_room): (sellout_rate, fill_rate)}"""
+    from schedule_analytics import ScheduleHistory, slot_stats  # NumPy, only when there is history
+
+    history = ScheduleHistory.from_store(store)
+    if not len(history):
+        return {}
+    stats = slot_stats(history)
+    return {
+        (str(location), int(weekday), int(start_min), str(teacher), int(room)): (float(sellout), float(fill))
+        for location, weekday, start_min, teacher, room, sellout, fill in zip(
+            stats["location"], stats["weekday"], stats["start_min"], stats["teacher"],
+            stats["studio_room"], stats["sellout_rate"], stats["fill_rate"])
+    }
+
+
+class SlotIndex:
+    """Scraped and predicted classes for every studio, indexed for constraint search
+
+    Rows are numbered in (date, start time) order, so a date range is a
+    row range. Family, teacher, studio, weekday and source each have an
+    inverted index from value to a sorted array of rows, and the interval
+    index maps each weekday's sorted start minutes to their rows, so a
+    time window is a bisect. Every posting list is cut to the date range
+    by bisection before anything else, and a search intersects only the
+    constraints it names, smallest first: its cost follows the matching
+    classes, not the months of history indexed.
+
+    Each row's rank is precomputed from its recurring slot's history:
+    1 - (sell-out rate + fill rate) / 2, times the prediction confidence
+    for predicted classes.
+    """
+
+    FIELDS = ("family", "teacher", "location", "weekday", "source")
+
+    def __init__(self, classes=(), availability=None, registry=None):
+        self.registry = registry or default_registry()
+        availability = availability or {}
+        rows = sorted((c for c in classes if c[0].day is not None and c[0].start_min != UNKNOWN),
+                      key=lambda c: (c[0].day, c[0].start_min, c[0].location, c[0].studio_room))
+        self.records = [record for record, _, _ in rows]
+        self.sources = [source for _, source, _ in rows]
+        self.confidence = array("d", (confidence for _, _, confidence in rows))
+        self.ordinal = array("i", (r.day.toordinal() for r in self.records))
+        self.start_min = array("h", (r.start_min for r in self.records))
+        self.weekday = array("b", (r.weekday for r in self.records))
+        self.is_full = bytearray(r.open_spots == 0 for r in self.records)
+        self.score = array("d")
+        # Per field: value -> rows (the inverted index), value -> code, and each row's code
+        postings = {name: {} for name in self.FIELDS}
+        self.codes = {name: {} for name in self.FIELDS}
+        self.columns = {name: array("i") for name in self.FIELDS}
+        by_start = {weekday: {} for weekday in range(7)}
+        full = array("i")
+        coaches = {}
+        for row, (record, source, confidence) in enumerate(rows):
+            coach = coaches.get(record.teacher)
+            if coach is None:
+                coach = coaches[record.teacher] = normalize_coach(record.teacher)
+            keys = (self.registry.family_key(record.family or record.name),
+                    coach, record.location, record.weekday, source)
+            for name, key in zip(self.FIELDS, keys):
+                postings[name].setdefault(key, array("i")).append(row)
+                self.columns[name].append(self.codes[name].setdefault(key, len(self.codes[name])))
+            by_start[record.weekday].setdefault(record.start_min, array("i")).append(row)
+            if record.open_spots == 0:
+                full.append(row)
+            stats = availability.get((record.location, record.weekday, record.start_min,
+                                      record.teacher, record.studio_room))
+            score = NO_HISTORY if stats is None else 1.0 - (stats[0] + stats[1]) / 2
+            self.score.append(score * confidence if source == "predicted" else score)
+        # Rows are appended in order, so every posting array is already sorted
+        self.postings = postings
+        self.full = full
+        self.by_start = {weekday: (array("h", sorted(starts)), [starts[s] for s in sorted(starts)])
+                         for weekday, starts in by_start.items()}
+        self.ranked = array("i", sorted(range(len(rows)), key=lambda row: (-self.score[row], row)))
+        self.rank = array("i", bytes(4 * len(rows)))
+        for position, row in enumerate(self.ranked):
+            self.rank[row] = position
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    @metrics.timed("slot_index_build")
+    def from_sources(cls, db_path=DB_PATH, scraped_json=SCRAPED_JSON, predicted_json=PREDICTED_JSON,
+                     registry=None):
+        """Index the store's scrape history (or the latest JSON scrape) plus the predicted month"""
+        scraped, availability = [], {}
+        if os.path.exists(db_path):
+            with ScheduleStore(db_path) as store:
+                scraped = store.classes_between()
+                availability = historical_availability(store)
+        if not scraped and os.path.exists(scraped_json):
+            with open(scraped_json, 'r') as f:
+                # Older scrapes were saved without a location and are all the default studio
+                scraped = records_from_dicts(
+                    [dict(item, location=item.get("location") or DEFAULT_SLUG) for item in json.load(f)])
+        classes = [(record, "scraped", 1.0) for record in scraped]
+        if os.path.exists(predicted_json):
+            with open(predicted_json, 'r') as f:
+                items = [dict(item, location=item.get("location") or DEFAULT_SLUG) for item in json.load(f)]
+            # A predicted class that has since been scraped is dropped in favour of the real one
+            seen = {(r.location, r.day, r.start_min) for r in scraped}
+            for record, item in zip(records_from_dicts(items), items):
+                if (record.location, record.day, record.start_min) not in seen:
+                    classes.append((record, "predicted", float(item.get("confidence", 1.0))))
+        return cls(classes, availability, registry)
+
+    @staticmethod
+    def _between(rows, lo, hi):
+        """The part of a sorted row array inside [lo, hi)"""
+        return rows[bisect_left(rows, lo):bisect_left(rows, hi)]
+
+    def _field(self, name, keys, lo, hi):
+        """(row count, posting pieces, per-row check) for "field is one of keys" """
+        index, codes, column = self.postings[name], self.codes[name], self.columns[name]
+        pieces = [self._between(index[key], lo, hi) for key in keys if key in index]
+        wanted = {codes[key] for key in keys if key in codes}
+        return sum(map(len, pieces)), pieces, lambda row: column[row] in wanted
+
+    def _window(self, weekdays, window, lo, hi):
+        """(row count, posting pieces, per-row check) for a start time window on some weekdays"""
+        first, last = window
+        pieces = []
+        for weekday in weekdays or range(7):
+            starts, rows = self.by_start[weekday]
+            pieces.extend(self._between(posting, lo, hi)
+                          for posting in rows[bisect_left(starts, first):bisect_left(starts, last)])
+        days, weekday_of, start_min = set(weekdays or range(7)), self.weekday, self.start_min
+        return (sum(map(len, pieces)), pieces,
+                lambda row: first <= start_min[row] < last and weekday_of[row] in days)
+
+    def search(self, query):
+        """(best matches first, up to query.limit; total number of matches)
+
+        The most selective constraint's rows are collected first; each
+        other constraint is then intersected if it is small, or checked
+        row by row against the code columns if it is not.
+        """
+        with metrics.timer("slot_search"):
+            lo = bisect_left(self.ordinal, (query.since or date.today()).toordinal())
+            hi = bisect_right(self.ordinal, query.until.toordinal()) if query.until else len(self.records)
+
+            constraints = []
+            if query.families:
+                constraints.append(self._field("family", {self.registry.family_key(f) for f in query.families}, lo, hi))
+            if query.teachers:
+                constraints.append(self._field("teacher", {normalize_coach(t) for t in query.teachers}, lo, hi))
+            if query.locations or query.areas:
+                slugs = set(query.locations)
+                for area in query.areas:
+                    slugs.update(self.registry.studios_in(area))
+                constraints.append(self._field("location", slugs, lo, hi))
+            if query.window:
+                constraints.append(self._window(query.weekdays, query.window, lo, hi))
+            elif query.weekdays:
+                constraints.append(self._field("weekday", query.weekdays, lo, hi))
+            if query.sources:
+                constraints.append(self._field("source", query.sources, lo, hi))
+
+            constraints.sort(key=lambda constraint: constraint[0])
+            if constraints:
+                matches = set()
+                for piece in constraints[0][1]:
+                    matches.update(piece)
+            else:
+                matches = set(range(lo, hi))
+            for size, pieces, check in constraints[1:]:
+                if not matches:
+                    break
+                if size <= 4 * len(matches):
+                    matches = matches.intersection(chain.from_iterable(pieces))
+                else:
+                    matches = {row for row in matches if check(row)}
+            if not query.include_full:
+                full = self._between(self.full, lo, hi)
+                if len(full) < len(matches):
+                    matches.difference_update(full)
+                else:
+                    is_full = self.is_full
+                    matches = {row for row in matches if not is_full[row]}
+
+            if len(matches) * 16 >= len(self.records):
+                # Plenty of matches: walking rows best-first finds the top ones quickly
+                best = list(islice((row for row in self.ranked if row in matches), query.limit))
+            else:
+                best = sorted(matches, key=self.rank.__getitem__)[:query.limit]
+            return [self.result(row) for row in best], len(matches)
+
+    def result(self, row):
+        """One match as a JSON-ready dict, with the fields add_class_to_schedule needs"""
+        record = self.records[row]
+        studio = self.registry.studios.get(record.location, {})
+        return {
+            "location": record.location,
+            "studio": studio.get("name", record.location),
+            "area": studio.get("area", ""),
+            "date": record.day.isoformat(),
+            "day_of_week": record.weekday_name,
+            "time": record.time,
+            "class": record.name,
+            "class_type": record.family,
+            "teacher": record.teacher,
+            "status": record.status,
+            "open_spots": record.open_spots if record.open_spots != UNKNOWN else None,
+            "registration_id": record.registration_id or None,
+            "source": self.sources[row],
+            "confidence": round(self.confidence[row], 2),
+            "availability": round(self.score[row], 3),
+        }
+
+
+class SlotSearchService:
+    """A SlotIndex that is rebuilt whenever one of its source files changes
+
+    For a long-running server: each search stats the sources (a few
+    microseconds) and only the first search after a new scrape or
+    prediction pays for a rebuild.
+    """
+
+    def __init__(self, db_path=DB_PATH, scraped_json=SCRAPED_JSON, predicted_json=PREDICTED_JSON,
+                 registry=None):
+        self.paths = (db_path, f"{db_path}-wal", scraped_json, predicted_json)
+        self.registry = registry
+        self._index = None
+        self._built_from = None
+        self._lock = threading.Lock()
+
+    def _signature(self):
+        return tuple(os.stat(path).st_mtime_ns if os.path.exists(path) else None for path in self.paths)
+
+    def index(self):
+        signature = self._signature()
+        if signature != self._built_from:
+            with self._lock:
+                if signature != self._built_from:
+                    db_path, _, scraped_json, predicted_json = self.paths
+                    self._index = SlotIndex.from_sources(db_path, scraped_json, predicted_json, self.registry)
+                    self._built_from = signature
+        return self._index
+
+    def search(self, params):
+        """The JSON response for one query's parameters"""
+        index = self.index()
+        start = time.perf_counter()
+        results, total = index.search(SlotQuery.from_params(params))
+        return {"results": results, "total": total,
+                "took_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+class SlotSearchHandler(BaseHTTPRequestHandler):
+    """GET /slots?family=Signature50&teacher=...&days=weekdays&between=6-8pm&area=Manhattan"""
+
+    service = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/slots":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            self._send(200, self.service.search(parse_qs(url.query)))
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+
+
+def start_search_server(service, port=8765, host="127.0.0.1"):
+    """Serve `service` on a background thread; returns (server, base_url)"""
+    handler = type("BoundSlotSearchHandler", (SlotSearchHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="search", description="Find classes across studios in scraped and predicted schedules")
+    parser.add_argument("--family", action="append", help="class family, e.g. Signature50 (repeatable)")
+    parser.add_argument("--teacher", action="append", help="teacher, e.g. \"Robert C.\" (repeatable)")
+    parser.add_argument("--location", action="append", help="studio slug (repeatable)")
+    parser.add_argument("--area", action="append", help="studio area, e.g. Manhattan (repeatable)")
+    parser.add_argument("--days", help="e.g. weekdays, weekends or mon,wed")
+    parser.add_argument("--between", help="start time window, e.g. 6-8pm or 18:00-20:00")
+    parser.add_argument("--since", help="first date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--until", help="last date, YYYY-MM-DD")
+    parser.add_argument("--source", choices=SOURCES, action="append", help="only scraped or predicted classes")
+    parser.add_argument("--include-full", action="store_true", help="include classes with no open spots")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--db", default=DB_PATH, help=f"scrape history (default: {DB_PATH})")
+    parser.add_argument("--add", type=int, metavar="RANK", help="add the RANK-th result to the wishlist")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="serve GET /slots as JSON instead")
+    args = parser.parse_args(argv)
+
+    metrics.configure()
+    service = SlotSearchService(db_path=args.db)
+    if args.serve is not None:
+        index = service.index()
+        server, base_url = start_search_server(service, args.serve)
+        print(f"🔎 Searching {len(index)} classes at {base_url}/slots")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+
+    params = {key: value for key, value in vars(args).items() if value not in (None, False)}
+    params["include_full"] = "true" if args.include_full else ""
+    params["limit"] = str(args.limit if args.add is None else max(args.limit, args.add))
+    try:
+        response = service.search(params)
+    except ValueError as e:
+        parser.error(str(e))
+    results = response["results"]
+    print(f"🔎 {response['total']} matching classes ({response['took_ms']} ms)")
+    for rank, slot in enumerate(results[:args.limit], 1):
+        spots = f"{slot['open_spots']} open" if slot["open_spots"] is not None else slot["source"]
+        print(f"{rank:3d}. {slot['date']} {slot['day_of_week'][:3]} {slot['time']:28s} "
+              f"{slot['studio']:24s} {slot['class']} with {slot['teacher']} "
+              f"({spots}, availability {slot['availability']:.2f})")
+
+    if args.add is not None:
+        if not 1 <= args.add <= len(results):
+            parser.error(f"--add {args.add}: only {len(results)} results")
+        from schedule_manager import ScheduleManager
+
+        slot = results[args.add - 1]
+        manager = ScheduleManager()
+        try:
+            manager.add_class_to_schedule(slot["location"], slot["class_type"] or slot["class"],
+                                          slot["day_of_week"], slot["time"], slot["teacher"],
+                                          date=slot["date"], registration_id=slot["registration_id"])
+            when = "at the next release" if manager.awaits_release(slot) else "now"
+        finally:
+            manager.close()
+        print(f"✅ Added {slot['class']} on {slot['date']} at {slot['studio']} to the wishlist; "
+              f"`solidcore book` books it {when}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+import glob
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+import metrics
+from schedule_records import UNKNOWN, WEEKDAYS
+
+CACHE_DIR = ".snapshot_cache"
+MAGIC = b"SCSNAP1\0"
+HEADER = struct.Struct("<8sI")  # magic, header JSON length
+ALIGN = 8
+
+# Column name -> array typecode; strings are stored as "i" codes into one string table
+INT_COLUMNS = {"weekday": "b", "start_min": "h", "end_min": "h", "duration": "h",
+               "open_spots": "h", "total_spots": "h", "studio_room": "h", "ordinal": "i"}
+STR_COLUMNS = ("date", "time", "name", "teacher", "status", "location", "registration_id")
+
+
+class Snapshot:
+    """One parsed schedule page as typed columns
+
+    Integer columns are memoryviews over the cache file's bytes and string
+    columns are codes into a shared table, so loading a snapshot is one
+    read and a small JSON decode, with no HTML parsing and no per-class
+    objects. Columns start 8-byte aligned, so the file can also be mmap'd.
+    """
+
+    def __init__(self, source, columns, strings):
+        self.source = source
+        self.columns = columns
+        self.strings = strings
+        self.rows = len(columns["weekday"]) if columns else 0
+
+    def __len__(self):
+        return self.rows
+
+    def values(self, column):
+        """A column's values, with string codes decoded"""
+        if column in INT_COLUMNS:
+            return self.columns[column]
+        strings = self.strings
+        return [strings[code] for code in self.columns[column]]
+
+    def day_keys(self):
+        """"Saturday05/24"-style labels, matching html_look's output"""
+        return [f"{WEEKDAYS[w] if w != UNKNOWN else ''}{d}"
+                for w, d in zip(self.columns["weekday"], self.values("date"))]
+
+    def full_classes(self):
+        """{"Saturday05/24": ["7:45am - 8:50am (65 min)", ...]} for every full class"""
+        results = {}
+        times = self.values("time")
+        for i, (day, open_spots) in enumerate(zip(self.day_keys(), self.columns["open_spots"])):
+            if open_spots == 0:
+                results.setdefault(day, []).append(times[i])
+        return results
+
+    def open_seats_by_day(self):
+        """{"Saturday05/24": open spots summed over classes with a known count}"""
+        results = {}
+        for day, open_spots in zip(self.day_keys(), self.columns["open_spots"]):
+            if open_spots != UNKNOWN:
+                results[day] = results.get(day, 0) + open_spots
+        return results
+
+    def teacher_load(self):
+        """{teacher: {"classes", "minutes", "booked", "spots"}}, busiest teacher first"""
+        load = {}
+        for teacher, duration, open_spots, total in zip(
+                self.values("teacher"), self.columns["duration"],
+                self.columns["open_spots"], self.columns["total_spots"]):
+            stats = load.get(teacher)
+            if stats is None:
+                stats = load[teacher] = {"classes": 0, "minutes": 0, "booked": 0, "spots": 0}
+            stats["classes"] += 1
+            stats["minutes"] += max(duration, 0)
+            if total > 0 and open_spots != UNKNOWN:
+                stats["booked"] += total - open_spots
+                stats["spots"] += total
+        return dict(sorted(load.items(), key=lambda item: (-item[1]["classes"], item[0])))
+
+
+def encode(records, source_stat, digest):
+    """Serialize ClassRecords into the cache file format"""
+    strings, codes = [], {}
+    columns = {}
+    for column, typecode in INT_COLUMNS.items():
+        if column == "ordinal":
+            values = (r.day.toordinal() if r.day else 0 for r in records)
+        else:
+            values = (getattr(r, column) for r in records)
+        columns[column] = array(typecode, values)
+    for column in STR_COLUMNS:
+        column_codes = array("i")
+        for r in records:
+            value = getattr(r, column)
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(strings)
+                strings.append(value)
+            column_codes.append(code)
+        columns[column] = column_codes
+
+    layout, blobs, offset = {}, [], 0
+    for column, values in columns.items():
+        blob = values.tobytes()
+        layout[column] = [values.typecode, offset, len(values)]
+        blobs.append(blob + b"\0" * (-len(blob) % ALIGN))
+        offset += len(blobs[-1])
+    table = json.dumps(strings).encode("utf-8")
+    header = {
+        "mtime_ns": source_stat.st_mtime_ns, "size": source_stat.st_size, "hash": digest,
+        "byteorder": sys.byteorder, "rows": len(records), "columns": layout,
+        "strings": [offset, len(table)],
+    }
+    return pack(header, b"".join(blobs) + table)
+
+
+def pack(header, payload):
+    """Magic, header and column payload, with the payload starting 8-byte aligned"""
+    encoded = json.dumps(header).encode("utf-8")
+    encoded += b" " * (-(HEADER.size + len(encoded)) % ALIGN)
+    return HEADER.pack(MAGIC, len(encoded)) + encoded + payload
+
+
+def decode_header(data):
+    """The header dict of a cache file's bytes, or None if it isn't one"""
+    if len(data) < HEADER.size:
+        return None
+    magic, length = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        return None
+    try:
+        header = json.loads(data[HEADER.size:HEADER.size + length])
+    except ValueError:
+        return None
+    return header if header.get("byteorder") == sys.byteorder else None
+
+
+def decode(data, source):
+    header = decode_header(data)
+    base = HEADER.size + HEADER.unpack_from(data)[1]
+    view = memoryview(data)
+    columns = {}
+    for column, (typecode, offset, count) in header["columns"].items():
+        start = base + offset
+        columns[column] = view[start:start + count * array(typecode).itemsize].cast(typecode)
+    offset, length = header["strings"]
+    strings = json.loads(data[base + offset:base + offset + length])
+    return Snapshot(source, columns, strings)
+
+
+class SnapshotCache:
+    """Parses each saved schedule page once into a columnar file under `cache_dir`
+
+    A cache file is reused while its page's mtime and size are unchanged.
+    If they change, the page is hashed, and it is only re-parsed if its
+    content actually changed. Files are written atomically, so concurrent
+    readers see either the old or the new cache.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def cache_path(self, source):
+        source = os.path.abspath(source)
+        tag = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"{os.path.basename(source)}.{tag}.snap")
+
+    def _read(self, path):
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write(self, path, body):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, source):
+        """The Snapshot for an HTML page, parsing it only if the cache is stale"""
+        stat = os.stat(source)
+        path = self.cache_path(source)
+        data = self._read(path)
+        header = decode_header(data) if data else None
+        if header and header["mtime_ns"] == stat.st_mtime_ns and header["size"] == stat.st_size:
+            metrics.count("snapshot_cache", result="hit")
+            return decode(data, source)
+
+        with open(source, "r", encoding="utf-8") as f:
+            html = f.read()
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        if header and header["hash"] == digest:
+            # Touched but unchanged: keep the columns, remember the new mtime
+            metrics.count("snapshot_cache", result="rehash")
+            header.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            body = pack(header, data[HEADER.size + HEADER.unpack_from(data)[1]:])
+        else:
+            metrics.count("snapshot_cache", result="miss")
+            from schedule_parser import parse_records  # lxml is only needed on a miss
+
+            with metrics.timer("snapshot_parse"):
+                records = parse_records(html)
+            body = encode(records, stat, digest)
+        self._write(path, body)
+        return decode(body, source)
+
+    def load_all(self, paths):
+        """Snapshots for files and directories (every *.html in them), in path order"""
+        sources = []
+        for path in paths:
+            if os.path.isdir(path):
+                sources.extend(sorted(glob.glob(os.path.join(path, "*.html"))))
+            else:
+                sources.append(path)
+        return [self.load(source) for source in sources]
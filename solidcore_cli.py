@@ -0,0 +1,94 @@
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+# command -> (module, function, passes its own arguments through, help)
+COMMANDS = {
+    "scrape": ("Solidcore_scraper", "main", True, "scrape class schedules (see scrape --help)"),
+    "predict": ("predict_next_month_schedule", "main", True, "predict next month's schedule [DB_PATH]"),
+    "look": ("html_look", "main", True, "query saved schedule pages: full classes, open seats, teacher load"),
+    "book": ("schedule_manager", "main", False, "book the wishlist, sniping the release if it is not out yet"),
+    "book-all": ("multi_user_engine", "main", True, "book every account in users.json [USERS_PATH]"),
+    "watch": ("seat_monitor", "main", False, "watch waitlisted classes and book when a spot opens"),
+    "search": ("slot_search", "main", True, "find classes across studios by type, teacher, day, time and area"),
+    "login": ("local_login", "main", False, "log in with a visible Chrome and save the cookies"),
+}
+
+# Seconds allowed to import a command's module from a cold start
+IMPORT_BUDGETS = {"scrape": 0.5, "predict": 0.3, "look": 0.3}
+
+
+def load_command(command):
+    """Import a command's entry point; returns (function, import seconds)"""
+    module_name, function, _, _ = COMMANDS[command]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    return getattr(module, function), time.perf_counter() - start
+
+
+def cold_import_seconds(command, runs=3):
+    """Best-of-`runs` import time of a command's module in a fresh interpreter"""
+    module_name = COMMANDS[command][0]
+    code = f"import time; t = time.perf_counter(); import {module_name}; print(time.perf_counter() - t)"
+    here = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True,
+                                text=True, check=True)
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def check_startup(commands):
+    """Print cold import times against IMPORT_BUDGETS; returns 1 if any is over budget"""
+    over = 0
+    for command in commands:
+        seconds = cold_import_seconds(command)
+        budget = IMPORT_BUDGETS.get(command)
+        ok = budget is None or seconds <= budget
+        over += not ok
+        limit = f" (budget {budget:.2f}s)" if budget is not None else ""
+        print(f"{'✅' if ok else '❌'} {command:8s} {seconds * 1000:6.0f} ms{limit}")
+    return 1 if over else 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="solidcore", description="Solidcore schedule scraper and booking bot",
+        epilog="Heavy dependencies (Selenium, BeautifulSoup, NumPy) are only imported by the commands that use them.")
+    parser.add_argument("--timing", action="store_true", help="report how long the command took to import")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, (_, _, passthrough, help_text) in COMMANDS.items():
+        # Pass-through commands parse their own arguments, --help included
+        subparsers.add_parser(command, help=help_text, add_help=not passthrough)
+    startup = subparsers.add_parser("startup", help="measure cold import time against the budgets")
+    startup.add_argument("commands", nargs="*", metavar="COMMAND",
+                         help=f"commands to check (default: {', '.join(IMPORT_BUDGETS)})")
+    args, extra = parser.parse_known_args(argv)
+    if extra and not (args.command in COMMANDS and COMMANDS[args.command][2]):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+
+    if args.command == "startup":
+        unknown = [c for c in args.commands if c not in COMMANDS]
+        if unknown:
+            parser.error(f"unknown commands: {', '.join(unknown)}")
+        return check_startup(args.commands or list(IMPORT_BUDGETS))
+
+    entry_point, seconds = load_command(args.command)
+    budget = IMPORT_BUDGETS.get(args.command)
+    if args.timing:
+        print(f"⏱️  {args.command} imported in {seconds * 1000:.0f} ms", file=sys.stderr)
+    if budget is not None and seconds > budget:
+        print(f"⚠️  {args.command} took {seconds:.2f}s to import (budget {budget:.2f}s)", file=sys.stderr)
+
+    if COMMANDS[args.command][2]:
+        return entry_point(extra)
+    return entry_point()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
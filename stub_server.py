@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Stand-in for solidcore.co, serving the checked-in HTML fixtures
+
+    GET  /book/<region>/<slug>                     schedule page (solidcore_schedule.html)
+    POST /assets/ajax/addMoreClassesStaticGrid.php {"finalData": raw_<dateChange>.html}
+    POST /assets/ajax/postBook.php                 {"Status":"Success"} after `booking_delay` seconds
+    """
+
+    fixture_dir = FIXTURE_DIR
+    booking_delay = 0.0
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+    def log_message(self, format, *args):
+        pass
+
+    def _fixture(self, name):
+        path = os.path.join(self.fixture_dir, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8"):
+        body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        return {key: values[0] for key, values in form.items()}
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.startswith("/book/"):
+            grid = self._fixture("solidcore_schedule.html") or ""
+            self._send(200, f"<html><head><title>Schedule</title></head><body>{grid}</body></html>")
+        else:
+            self._send(200, "<html><head><title>Stub</title></head><body></body></html>")
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        form = self._form()
+        if path.endswith("/addMoreClassesStaticGrid.php"):
+            html = self._fixture(f"raw_{form.get('dateChange', '')}.html") or ""
+            self._send(200, json.dumps({"finalData": html}), "application/json")
+        elif path.endswith("/postBook.php"):
+            time.sleep(self.booking_delay)
+            body = json.dumps({"Status": "Success", "slug": form.get("slug", "")}, separators=(",", ":"))
+            self._send(200, body, "application/json")
+        else:
+            self._send(404, "Not Found", "text/plain")
+
+
+def start_stub_server(port=0, handler=StubHandler):
+    """Serve the stub on a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    server, base_url = start_stub_server(port)
+    print(f"🧪 Stub solidcore.co serving fixtures at {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,143 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+from schedule_records import FAMILY_RE
+
+REGISTRY_FILE = "studios.json"
+DEFAULT_REGION = "new-york"
+STUDIO_URL = "https://solidcore.co/book/{region}/{slug}"
+SLUG_LINK_RE = re.compile(r"/(?:book|waitlist)/[^/\"']*/([a-z0-9-]+)")
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]")
+
+
+def compact(text):
+    """ "Signature 50", "signature50" and "SIGNATURE-50" all become "signature50" """
+    return NON_ALNUM_RE.sub("", (text or "").lower())
+
+
+def studios_from_html(html):
+    """Studio slugs linked from a scraped schedule or studio list page"""
+    return sorted(set(SLUG_LINK_RE.findall(html or "")))
+
+
+class StudioRegistry:
+    """Studios and class types, loaded from studios.json
+
+    Class names are matched by canonical family ("Signature50",
+    "Power30", ...). Every wishlist key, family name and alias is
+    compacted into one dict when the registry is built, so resolving a
+    name is a dictionary hit; scraped names such as
+    "Studio 2 | Off-Peak Signature50: Full Body" fall back to one
+    precompiled regex, and results are cached since the same few dozen
+    names repeat across thousands of records.
+    """
+
+    def __init__(self, studios=None, class_types=None, families=(), aliases=None,
+                 region=DEFAULT_REGION):
+        self.region = region
+        self.studios = {}
+        for slug, info in (studios or {}).items():
+            self.add_studio(slug, **info)
+        self.class_types = dict(class_types or {})
+        self._aliases = {}
+        for family in families:
+            self._aliases[compact(family)] = family
+        for key, name in self.class_types.items():
+            self._aliases.setdefault(compact(key), self._scan(name) or name)
+        for alias, family in (aliases or {}).items():
+            self._aliases[compact(alias)] = family
+        self.family = lru_cache(maxsize=4096)(self._family)
+
+    @classmethod
+    def load(cls, path=REGISTRY_FILE):
+        """Registry from a JSON config; an empty one if the file is missing"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r') as f:
+            return cls(**json.load(f))
+
+    def save(self, path=REGISTRY_FILE):
+        """Write the studios back to the config, keeping its other keys"""
+        config = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                config = json.load(f)
+        config["studios"] = {slug: {"name": info["name"]} for slug, info in self.studios.items()}
+        for slug, info in self.studios.items():
+            if info["area"]:
+                config["studios"][slug]["area"] = info["area"]
+            if info["url"] != STUDIO_URL.format(region=self.region, slug=slug):
+                config["studios"][slug]["url"] = info["url"]
+        with open(path, 'w') as f:
+            json.dump(config, f, indent=2)
+
+    def add_studio(self, slug, name=None, url=None, region=None, area=None):
+        self.studios[slug] = {
+            "name": name or slug.replace("-", " ").title(),
+            "url": url or STUDIO_URL.format(region=region or self.region, slug=slug),
+            "area": area or "",
+        }
+
+    def add_studios_from_html(self, html):
+        """Register every studio linked from `html` that is not known yet; returns the new slugs"""
+        added = [slug for slug in studios_from_html(html) if slug not in self.studios]
+        for slug in added:
+            self.add_studio(slug)
+        return added
+
+    def __contains__(self, slug):
+        return slug in self.studios
+
+    def url(self, slug):
+        return self.studios[slug]["url"]
+
+    def studios_in(self, area):
+        """Slugs of the studios in an area such as "Manhattan" or "Brooklyn" """
+        area = compact(area)
+        return [slug for slug, info in self.studios.items() if compact(info["area"]) == area]
+
+    def _scan(self, name):
+        match = FAMILY_RE.search(name or "")
+        return match.group(1) if match else ""
+
+    def _family(self, name):
+        key = compact(name)
+        if key in self._aliases:
+            return self._aliases[key]
+        found = self._scan(name)
+        return self._aliases.get(compact(found), found)
+
+    def family_key(self, name):
+        """Lowercase family used as an index key; the compacted name if no family is found"""
+        return (self.family(name) or compact(name)).lower()
+
+    def matches(self, wanted, scraped_name):
+        return self.family_key(wanted) == self.family_key(scraped_name)
+
+
+_default = None
+
+
+def default_registry():
+    """The studios.json registry, loaded once per process"""
+    global _default
+    if _default is None:
+        _default = StudioRegistry.load()
+    return _default
+
+
+if __name__ == "__main__":
+    import sys
+
+    registry = StudioRegistry.load()
+    added = []
+    for html_path in sys.argv[1:]:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            added += registry.add_studios_from_html(f.read())
+    if added:
+        registry.save()
+        print(f"✅ Added {len(added)} studios to {REGISTRY_FILE}: {', '.join(added)}")
+    else:
+        print(f"ℹ️ No new studios; {len(registry.studios)} known")
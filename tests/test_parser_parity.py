@@ -0,0 +1,57 @@
+import glob
+import os
+
+import pytest
+
+from schedule_parser import PARSERS, parse_records, seat_counts
+from schedule_records import parse_status
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = sorted(glob.glob(os.path.join(ROOT, "raw_*.html")))
+
+pytestmark = pytest.mark.skipif("lxml" not in PARSERS, reason="lxml is not installed")
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_fixtures_present():
+    assert FIXTURES
+
+
+@pytest.mark.parametrize("with_links", [False, True])
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_lxml_matches_bs4(path, with_links):
+    html = read(path)
+    expected = PARSERS["bs4"](html, with_links)
+    assert expected
+    assert PARSERS["lxml"](html, with_links) == expected
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_records_match_across_backends(path):
+    html = read(path)
+    assert parse_records(html, "chelsea", backend="lxml") == parse_records(html, "chelsea", backend="bs4")
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_seat_counts_match_full_parse(path):
+    html = read(path)
+    expected = {r.registration_id: (r.action, r.status)
+                for r in parse_records(html, backend="bs4") if r.registration_id}
+    assert seat_counts(html) == expected
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_partial_seat_count(backend):
+    # "10 of 13 open": two-digit open count, neither full nor empty
+    assert parse_status("10 of 13 open") == (10, 13)
+    html = read(os.path.join(ROOT, "raw_2025-05-25.html"))
+    records = [r for r in parse_records(html, backend=backend) if r.status == "10 of 13 open"]
+    assert records
+    for record in records:
+        assert (record.open_spots, record.total_spots) == (10, 13)
+        assert not record.is_full
+        assert seat_counts(html)[record.registration_id][1] == "10 of 13 open"